@@ -1,32 +1,60 @@
 import streamlit as st
-import pandas as pd
-import datetime
-from PIL import Image
-import plotly.express as px
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from startup import mark, startup_report
+import time
 import plotly.graph_objects as go
-from wordcloud import WordCloud, STOPWORDS
-import networkx as nx
-import matplotlib.pyplot as plt
-
-# Load the Excel file
+import config
+import figures
+from cache import shared_cache
+from backends import get_backend
+from binning import density_table
+from charts import BUILDERS, chart_specs, sort_data
+from cube import DIMENSIONS
+from exports import EXPORT_FORMATS, deferred_export, export_mime, export_name
+from filters import filters_key, get_filter_index, make_filters
+from flows import sankey_flows
+from profiling import RunProfile, figure_bytes, process_summary
+from rasters import file_bytes, word_cloud_png
+from raw_data import PAGE_SIZES, page_count, page_rows, value_range, view_positions
+from refresher import current_dataset, refresh_error
+from scheduler import SectionTasks, get_pool
+from sections import output_key
+from timeseries import GRANULARITIES
+
+# Wall time, rows, payload bytes and cache use of each section in this run, logged under the session id
+run_context = get_script_run_ctx()
+perf = RunProfile(run_context.session_id if run_context is not None else None)
+
+# Load the Excel file (through the columnar snapshot cache); new versions are prepared in the background
+perf.start("load_data")
 try:
-    df = pd.read_excel("Adidas.xlsx")
+    dataset = current_dataset(config.DATA_PATH)
+    df = dataset.df
 except FileNotFoundError:
-    st.error("Error: The file 'Adidas.xlsx' was not found.")
+    st.error(f"Error: The file '{config.DATA_PATH}' was not found.")
     st.stop()
 except Exception as e:
     st.error(f"Error loading Excel file: {e}")
     st.stop()
 
+# Query backend serving the aggregated charts below, shared per dataset version
+try:
+    backend = get_backend(dataset, config.BACKEND)
+except Exception as e:
+    st.error(f"Error starting the '{config.BACKEND}' query backend: {e}")
+    st.stop()
+perf.add_rows(len(dataset.df))
+perf.end()
+
 # Set page layout
 st.set_page_config(layout="wide")
 
 # Custom CSS for reducing top padding
 st.markdown('<style>div.block-container{padding-top:2.1rem;}</style>', unsafe_allow_html=True)
 
-# Load and display the logo
+# Load and display the logo (raw bytes, no image library needed up front; read again only when the file changes)
 try:
-    image = Image.open('adidas-logo.jpg')
+    image = file_bytes('adidas-logo.jpg')
 except FileNotFoundError:
     st.error("Error: The logo file 'adidas-logo.jpg' was not found.")
     st.stop()
@@ -54,507 +82,662 @@ html_title = """
 with col2:
     st.markdown(html_title, unsafe_allow_html=True)
 
-# Sorting options
-sort_order = st.radio("Sort Data", options=["Ascending", "Descending"])
+# Filters: resolved to a row selection through the prebuilt filter index, then served from cached aggregates
+filter_index = get_filter_index(dataset)
+first_date, last_date = filter_index.date_range()
+with st.sidebar:
+    st.header("Filters")
+    date_range = st.date_input("Invoice Date", value=(first_date, last_date),
+                               min_value=first_date, max_value=last_date)
+    selections = {field: st.multiselect(column, filter_index.values[column])
+                  for field, column in [("retailers", "Retailer"), ("regions", "Region"),
+                                        ("states", "State"), ("products", "Product")]}
+
+# A half-picked range only has a start date; the full range means no date filter
+start_date, end_date = (tuple(date_range) + (None, None))[:2]
+filters = make_filters(start_date if start_date != first_date else None,
+                       end_date if end_date != last_date else None, **selections)
+
+filter_start = time.perf_counter()
+perf.start("filters")
+backend = backend.filtered(filters)
+perf.add_rows(backend.dataset.rows)
+perf.end()
+st.sidebar.caption(f"{backend.dataset.rows:,} of {dataset.rows:,} rows, selected in "
+                   f"{(time.perf_counter() - filter_start) * 1000:.1f} ms")
+if not backend.dataset.rows:
+    st.warning("No sales match the selected filters.")
+    st.stop()
 
-# Helper function for sorting data
-def sort_data(df, column, order):
-    return df.sort_values(by=column, ascending=(order == "Ascending"))
+# Export files and outputs depend on the filters as well as the dataset version
+filter_variant = filters_key(filters)
+
+# Current values of the inputs in sections.INPUTS; read on the script thread, as tasks cannot use session state
+def output_values():
+    return {"dataset": dataset.version, "filters": filter_variant,
+            "sort_order": st.session_state.get("sort_order", "Ascending"),
+            "granularity": st.session_state.get("granularity", "Monthly"),
+            "sankey_levels": tuple(st.session_state.get("sankey_levels", config.SANKEY_LEVELS))}
+
+# Outputs are shared by every session, keyed by the inputs they declare in sections.DEPENDENCIES
+def cached_output(name, build):
+    key = output_key(name, output_values())
+    perf.cache_result(key in shared_cache)
+    return shared_cache.get_or_build(key, build)
+
+# Task building a shared output on the section pool; returns the output and whether it was already cached
+def output_task(name, values, build):
+    key = output_key(name, values)
+
+    def run():
+        hit = key in shared_cache
+        return shared_cache.get_or_build(key, build), hit
+
+    return run
+
+# Task output collected by its section (see output_task), recorded in the section's profile
+def task_output(tasks, name):
+    value, hit = tasks.result(name)
+    perf.cache_result(hit)
+    return value
+
+# A chart's data and figure (charts.chart_specs), cached together
+def chart_build(name, data):
+    def build():
+        value = data()
+        return value, BUILDERS[name](value)
+
+    return build
+
+def chart_output(tasks, name):
+    data, fig = task_output(tasks, name)
+    first = data[0] if isinstance(data, tuple) else data
+    if hasattr(first, "columns"):
+        perf.add_rows(len(first))
+    return data, fig
+
+def cached_figure(name, build, *args):
+    if hasattr(args[0], "columns"):
+        perf.add_rows(len(args[0]))
+    return cached_output(name, lambda: build(*args))
+
+# Render a chart and record its serialized size
+def show_chart(fig):
+    st.plotly_chart(fig, use_container_width=True)
+    perf.add_payload(figure_bytes(fig))
+
+# Charts on the first screen, built before any other chart task is submitted
+FIRST_SCREEN_CHARTS = ["retailer_bar", "monthly_line"]
+
+# Chart sections with the sort control: a sort change reruns only this fragment, and outputs that do not
+# depend on the sort order are served from the shared cache (see sections.DEPENDENCIES)
+@st.fragment
+def chart_sections():
+    # Sorting options
+    sort_order = st.radio("Sort Data", options=["Ascending", "Descending"], key="sort_order")
+
+    # Time granularity of the sales-over-time charts and tables
+    granularity = st.radio("Time granularity", options=list(GRANULARITIES), index=list(GRANULARITIES).index("Monthly"),
+                           horizontal=True, key="granularity")
+
+    # Export files depend on the sort order and the filters as well as the dataset version
+    export_variant = "-".join(part for part in (sort_order, filter_variant) if part)
+    time_variant = "-".join(part for part in (sort_order, granularity, filter_variant) if part)
+
+    # Aggregate and build the charts and the word cloud on the section pool. The first-screen charts are
+    # submitted now and the rest once those are on the page, so they do not compete with the first screen for
+    # the GIL. Each section waits only for its own task, so it is written as soon as that task is done (in page
+    # order) while later charts are still being built. The Sankey diagram has its own fragment.
+    def word_cloud():
+        return word_cloud_png(backend.product_sales().set_index("Product")["Frequency"], "Word Cloud of Products")
+
+    values = output_values()
+    specs = chart_specs(backend, sort_order, granularity)
+    tasks = SectionTasks(get_pool())
+    for name in FIRST_SCREEN_CHARTS:
+        tasks.submit(name, output_task(name, values, chart_build(name, specs[name][1])))
+    perf.tasks = tasks
+
+    # Display the last updated date
+    # sourcery skip: identity-comprehension, remove-unnecessary-cast
+    col3, col4, col5 = st.columns([0.1, 0.45, 0.45])
+
+    with col3:
+        box_date = str(dataset.modified.strftime("%d %B %Y"))
+        st.write(f"Last updated by: \n {box_date}")
+        st.caption(f"Data loaded from {dataset.load_kind} in {dataset.load_seconds * 1000:.1f} ms")
+        if dataset.read_stats is not None:
+            st.caption(f"Source parsed at {dataset.read_stats['rows_per_second']:,.0f} rows/s "
+                       f"({dataset.read_stats['sheets']} sheets)")
+        if refresh_error() is not None:
+            st.warning(f"Data refresh failed, showing the previous data: {refresh_error()}")
+        if dataset.batches:
+            st.caption(f"Includes {len(dataset.batches)} appended batches "
+                       f"({sum(batch['rows'] for batch in dataset.batches):,} rows)")
+
+    perf.start("retailer_and_monthly_sales")
+    try:
+        # Total Sales by Retailer
+        sorted_df, fig = chart_output(tasks, "retailer_bar")
+        with col4:
+            show_chart(fig)
+            mark("retailer_bar")
+
+        _, view1, dwn1, view2, dwn2 = st.columns([0.15, 0.20, 0.20, 0.20, 0.20])
+
+        with view1:
+            expander = st.expander("Retailer wise Sales")
+            data = sorted_df.set_index("Retailer")["TotalSales"]
+            expander.write(data)
+
+        with dwn1:
+            st.download_button("Get Data", data=deferred_export(dataset, data, "RetailerSales.csv", variant=export_variant),
+                               file_name="RetailerSales.csv", mime="text/csv")
+
+        # Total Sales Over Time at the selected granularity, in date order; the sort order applies to the table
+        (series, _), fig1 = chart_output(tasks, "monthly_line")
+        sorted_result = sort_data(series[["Period", "TotalSales"]], "TotalSales", sort_order)
+
+        with col5:
+            show_chart(fig1)
+            mark("monthly_line")
+
+        with view2:
+            expander = st.expander(f"{granularity} Sales")
+            expander.write(sorted_result)
+
+        with dwn2:
+            st.download_button("Get Data", data=deferred_export(dataset, sorted_result, "MonthlySales.csv", variant=time_variant),
+                               file_name="MonthlySales.csv", mime="text/csv")
+    except Exception as e:
+        st.error(f"An error occurred: {e}")
+    finally:
+        perf.end()
+
+    # The rest of the page, now that the first screen is written
+    for name, (_, data, _) in specs.items():
+        if name not in FIRST_SCREEN_CHARTS and name != "sankey":
+            tasks.submit(name, output_task(name, values, chart_build(name, data)))
+    tasks.submit("word_cloud", output_task("word_cloud", values, word_cloud))
 
-# Display the last updated date
-# sourcery skip: identity-comprehension, remove-unnecessary-cast
-col3, col4, col5 = st.columns([0.1, 0.45, 0.45])
+    st.divider()
 
-with col3:
-    box_date = str(datetime.datetime.now().strftime("%d %B %Y"))
-    st.write(f"Last updated by: \n {box_date}")
+    perf.start("state_sales")
+    try:
+        # Total Sales and Units Sold by State
+        sorted_result1, fig3 = chart_output(tasks, "state_combo")
+
+        _, col6 = st.columns([0.1, 1])
+        with col6:
+            show_chart(fig3)
+
+        _, view3, dwn3 = st.columns([0.5, 0.45, 0.45])
+        with view3:
+            expander = st.expander("View Data for Sales by Units Sold")
+            expander.write(sorted_result1)
+
+        with dwn3:
+            st.download_button("Get Data", data=deferred_export(dataset, sorted_result1, "Sales_by_UnitsSold.csv", variant=export_variant),
+                               file_name="Sales_by_UnitsSold.csv", mime="text/csv")
+
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check the column names in your dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. Please check the data types in your dataset.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
 
-try:
-    # Total Sales by Retailer
-    sorted_df = sort_data(df, "TotalSales", sort_order)
-    with col4:
-        fig = px.bar(sorted_df, x="Retailer", y="TotalSales", labels={"TotalSales": "Total Sales {$}"},
-                     title="Total Sales by Retailer", hover_data=["TotalSales"],
-                     template="gridon", height=500, color="Retailer", 
-                     color_discrete_map={product: color for product, color in zip(sorted_df["Retailer"].unique(), px.colors.qualitative.Antique)})
-        st.plotly_chart(fig, use_container_width=True)
-
-    _, view1, dwn1, view2, dwn2 = st.columns([0.15, 0.20, 0.20, 0.20, 0.20])
-
-    with view1:
-        expander = st.expander("Retailer wise Sales")
-        data = sorted_df[["Retailer", "TotalSales"]].groupby(by="Retailer")["TotalSales"].sum()
-        expander.write(data)
-
-    with dwn1:
-        st.download_button("Get Data", data=data.to_csv().encode("utf-8"),
-                           file_name="RetailerSales.csv", mime="text/csv")
-
-    # Total Sales Over Time
-    df["Month_Year"] = df["InvoiceDate"].dt.strftime("%b'%y")
-    result = df.groupby(by="Month_Year")["TotalSales"].sum().reset_index()
-    sorted_result = sort_data(result, "TotalSales", sort_order)
-
-    with col5:
-        fig1 = px.line(sorted_result, x="Month_Year", y="TotalSales", title="Total Sales Over Time",
-                       template="gridon")
-        st.plotly_chart(fig1, use_container_width=True)
-
-    with view2:
-        expander = st.expander("Monthly Sales")
-        expander.write(sorted_result)
-
-    with dwn2:
-        st.download_button("Get Data", data=sorted_result.to_csv().encode("utf-8"),
-                           file_name="MonthlySales.csv", mime="text/csv")
-except Exception as e:
-    st.error(f"An error occurred: {e}")
+    st.divider()
 
-st.divider()
+    perf.start("region_city_treemap")
+    try:
+        # Total Sales by Region and City in Treemap
+        sorted_treemap, fig4 = chart_output(tasks, "region_city_treemap")
+
+        _, col7 = st.columns([0.1, 1])
+        with col7:
+            st.subheader("👉Total Sales by Region and City in Treemap")
+            show_chart(fig4)
+
+        _, view4, dwn4 = st.columns([0.5, 0.45, 0.45])
+        with view4:
+            result2 = sorted_treemap
+            expander = st.expander("View data for Total Sales by Region and City")
+            expander.write(result2)
+
+        with dwn4:
+            st.download_button("Get Data", data=deferred_export(dataset, result2, "Sales_by_Region.csv", variant=export_variant),
+                               file_name="Sales_by_Region.csv", mime="text/csv")
+
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if the 'Region', 'City', or 'TotalSales' columns exist in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data types or the format of the values.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
 
-try:
-    # Total Sales and Units Sold by State
-    result1 = df.groupby(by="State")[["TotalSales", "UnitsSold"]].sum().reset_index()
-    sorted_result1 = sort_data(result1, "TotalSales", sort_order)
-
-    fig3 = go.Figure()
-    fig3.add_trace(go.Bar(x=sorted_result1["State"], y=sorted_result1["TotalSales"], name="Total Sales",
-                          marker_color=[px.colors.qualitative.Antique[i % len(px.colors.qualitative.Antique)] 
-                                        for i in range(len(sorted_result1["State"]))]))
-    fig3.add_trace(go.Scatter(x=sorted_result1["State"], y=sorted_result1["UnitsSold"], mode="lines",
-                              name="Units Sold", yaxis="y2"))
-    fig3.update_layout(
-        title="Total Sales and Units Sold by State",
-        xaxis=dict(title="State"),
-        yaxis=dict(title="Total Sales", showgrid=False),
-        yaxis2=dict(title="Units Sold", overlaying="y", side="right"),
-        template="gridon",
-        legend=dict(x=1, y=1)
-    )
-
-    _, col6 = st.columns([0.1, 1])
-    with col6:
-        st.plotly_chart(fig3, use_container_width=True)
-
-    _, view3, dwn3 = st.columns([0.5, 0.45, 0.45])
-    with view3:
-        expander = st.expander("View Data for Sales by Units Sold")
-        expander.write(sorted_result1)
-
-    with dwn3:
-        st.download_button("Get Data", data=sorted_result1.to_csv().encode("utf-8"),
-                           file_name="Sales_by_UnitsSold.csv", mime="text/csv")
-
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check the column names in your dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. Please check the data types in your dataset.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+    st.divider()
 
-st.divider()
+    perf.start("city_pie")
+    try:
+        # Total Sales by City in Piechart
+        sorted_piechart, fig5 = chart_output(tasks, "city_pie")
+
+        _, col8 = st.columns([0.1, 1])
+        with col8:
+            st.subheader("👉Total Sales by City in Piechart")
+            show_chart(fig5)
+
+        _, view6, dwn6 = st.columns([0.5, 0.45, 0.45])
+        with view6:
+            result3 = sorted_piechart
+            expander = st.expander("View data for Total Sales by City")
+            expander.write(result3)
+
+        with dwn6:
+            st.download_button("Get Data", data=deferred_export(dataset, sorted_piechart, "Sales_by_City.csv", variant=export_variant),
+                               file_name="Sales_by_City.csv", mime="text/csv")
+
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if the 'City' or 'TotalSales' columns exist in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data types or the format of the values.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
 
-try:
-    # Total Sales by Region and City in Treemap
-    treemap = df[["Region", "City", "TotalSales"]].groupby(by=["Region", "City"])["TotalSales"].sum().reset_index()
-    sorted_treemap = sort_data(treemap, "TotalSales", sort_order)
-
-    def format_sales(value):
-        if value >= 0:
-            return '{:.2f} Lakh'.format(value / 1_00_000)
-
-    sorted_treemap["TotalSales (Formatted)"] = sorted_treemap["TotalSales"].apply(format_sales)
-    fig4 = px.treemap(sorted_treemap, path=["Region", "City"], values="TotalSales",
-                      hover_name="TotalSales (Formatted)",
-                      hover_data=["TotalSales (Formatted)"],
-                      color="City", height=700, width=600)
-
-    fig4.update_traces(textinfo="label+value")
-
-    _, col7 = st.columns([0.1, 1])
-    with col7:
-        st.subheader("👉Total Sales by Region and City in Treemap")
-        st.plotly_chart(fig4, use_container_width=True)
-
-    _, view4, dwn4 = st.columns([0.5, 0.45, 0.45])
-    with view4:
-        result2 = sorted_treemap
-        expander = st.expander("View data for Total Sales by Region and City")
-        expander.write(result2)
-
-    with dwn4:
-        st.download_button("Get Data", data=result2.to_csv().encode("utf-8"),
-                           file_name="Sales_by_Region.csv", mime="text/csv")
-
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if the 'Region', 'City', or 'TotalSales' columns exist in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data types or the format of the values.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+    st.divider()
 
-st.divider()
+    perf.start("product_donut")
+    try:
+        # Sales Share by Product in Donut Chart
+        sorted_product_sales, fig9 = chart_output(tasks, "product_donut")
+
+        _, col9 = st.columns([0.1, 1])
+        with col9:
+            st.subheader(" Sales Share by Product")
+            show_chart(fig9)
+
+        _, view7, dwn7 = st.columns([0.5, 0.45, 0.45])
+        with view7:
+            result4 = sorted_product_sales
+            expander = st.expander("View data for Sales Share by Product")
+            expander.write(result4)
+
+        with dwn7:
+            st.download_button("Get Data", data=deferred_export(dataset, sorted_product_sales, "Sales_Share_by_Product.csv", variant=export_variant),
+                               file_name="Sales_Share_by_Product.csv", mime="text/csv")
+
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if the 'Product' or 'TotalSales' columns exist in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data types or the format of the values.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
 
-try:
-    # Total Sales by City in Piechart
-    piechart = df.groupby(by=['City'])['TotalSales'].sum().reset_index()
-    sorted_piechart = sort_data(piechart, "TotalSales", sort_order)
-
-    fig5 = px.pie(sorted_piechart, values='TotalSales', names='City')
-    fig5.update_layout(margin=dict(l=0, r=0, t=50, b=0))
-
-    _, col8 = st.columns([0.1, 1])
-    with col8:
-        st.subheader("👉Total Sales by City in Piechart")
-        st.plotly_chart(fig5, use_container_width=True)
-
-    _, view6, dwn6 = st.columns([0.5, 0.45, 0.45])
-    with view6:
-        result3 = sorted_piechart
-        expander = st.expander("View data for Total Sales by City")
-        expander.write(result3)
-
-    with dwn6:
-        st.download_button("Get Data", data=sorted_piechart.to_csv().encode("utf-8"),
-                           file_name="Sales_by_City.csv", mime="text/csv")
-
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if the 'City' or 'TotalSales' columns exist in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data types or the format of the values.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+    st.divider()
 
-st.divider()
+    perf.start("correlation_heatmap")
+    try:
+        # Correlation Heatmap
+        corr, fig10 = chart_output(tasks, "correlation_heatmap")
 
-try:
-    # Sales Share by Product in Donut Chart
-    product_sales = df[["Product", "TotalSales"]].groupby(by="Product").sum().reset_index()
-    sorted_product_sales = sort_data(product_sales, "TotalSales", sort_order)
-
-    fig9 = px.pie(sorted_product_sales, values='TotalSales', names='Product', hole=.3,
-                  hover_data=['TotalSales'], labels={'TotalSales':'Sales'})
-
-    fig9.update_traces(textinfo='percent+label')
-
-    _, col9 = st.columns([0.1, 1])
-    with col9:
-        st.subheader(" Sales Share by Product")
-        st.plotly_chart(fig9, use_container_width=True)
-
-    _, view7, dwn7 = st.columns([0.5, 0.45, 0.45])
-    with view7:
-        result4 = sorted_product_sales
-        expander = st.expander("View data for Sales Share by Product")
-        expander.write(result4)
-
-    with dwn7:
-        st.download_button("Get Data", data=sorted_product_sales.to_csv().encode("utf-8"),
-                           file_name="Sales_Share_by_Product.csv", mime="text/csv")
-
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if the 'Product' or 'TotalSales' columns exist in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data types or the format of the values.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+        _, col10 = st.columns([0.1, 1])
+        with col10:
+            st.subheader(" Correlation Heatmap of Sales Data")
+            show_chart(fig10)
 
-st.divider()
+        _, view8, dwn8 = st.columns([0.5, 0.45, 0.45])
+        with view8:
+            result5 = corr
+            expander = st.expander("View data for Correlation Heatmap")
+            expander.write(result5)
 
-try:
-    # Correlation Heatmap
-    corr_cols = ["PriceperUnit", "UnitsSold", "TotalSales", "OperatingProfit", "OperatingMargin"]
-    corr = df[corr_cols].corr()
-
-    fig10 = px.imshow(corr, text_auto=True, aspect="auto", color_continuous_scale='RdBu_r')
-
-    _, col10 = st.columns([0.1, 1])
-    with col10:
-        st.subheader(" Correlation Heatmap of Sales Data")
-        st.plotly_chart(fig10, use_container_width=True)
-
-    _, view8, dwn8 = st.columns([0.5, 0.45, 0.45])
-    with view8:
-        result5 = df[corr_cols].corr()
-        expander = st.expander("View data for Correlation Heatmap")
-        expander.write(result5)
-
-    with dwn8:
-        st.download_button("Get Data", data=corr.to_csv().encode("utf-8"),
-                           file_name="Correlation_Heatmap_of_SalesData.csv", mime="text/csv")
-
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if the required columns exist in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+        with dwn8:
+            st.download_button("Get Data", data=deferred_export(dataset, corr, "Correlation_Heatmap_of_SalesData.csv", variant=filter_variant),
+                               file_name="Correlation_Heatmap_of_SalesData.csv", mime="text/csv")
 
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if the required columns exist in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
 
-st.divider()
 
-try:
-    # Scatterplot: Units Sold vs Price per Unit
-    sorted_scatter = sort_data(df, "UnitsSold", sort_order)
-    fig11 = px.scatter(sorted_scatter, x="PriceperUnit", y="UnitsSold")
-
-    _, col11 = st.columns([0.1, 1])
-    with col11:
-        st.subheader(" Units Sold vs Price per Unit")
-        st.plotly_chart(fig11, use_container_width=True)
-
-    _, view9, dwn9 = st.columns([0.5, 0.45, 0.45])
-    with view9:
-        result6 = sorted_scatter[["PriceperUnit", "UnitsSold"]]
-        expander = st.expander("View data for Units Sold vs Price per Unit")
-        expander.write(result6)
-
-    with dwn9:
-        st.download_button("Get Data", data=result6.to_csv().encode("utf-8"),
-                           file_name="Units_Sold_vs_Price_per_Unit.csv", mime="text/csv")
-
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if the 'PriceperUnit' or 'UnitsSold' columns exist in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+    st.divider()
 
-st.divider()
+    perf.start("price_units_density")
+    try:
+        # Scatterplot: Units Sold vs Price per Unit, binned on the server into a 2D density grid
+        (counts, price_bins, units_bins), fig11 = chart_output(tasks, "density_heatmap")
+
+        _, col11 = st.columns([0.1, 1])
+        with col11:
+            st.subheader(" Units Sold vs Price per Unit")
+            show_chart(fig11)
+
+        _, view9, dwn9 = st.columns([0.5, 0.45, 0.45])
+        with view9:
+            result6 = sort_data(density_table(counts, price_bins, units_bins, "PriceperUnit", "UnitsSold"),
+                                "UnitsSold", sort_order)
+            expander = st.expander("View data for Units Sold vs Price per Unit")
+            expander.write(result6)
+
+        with dwn9:
+            st.download_button("Get Data", data=deferred_export(dataset, result6, "Units_Sold_vs_Price_per_Unit.csv", variant=export_variant),
+                               file_name="Units_Sold_vs_Price_per_Unit.csv", mime="text/csv")
+
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if the 'PriceperUnit' or 'UnitsSold' columns exist in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
 
-try:
-    # Histogram: Distribution of Operating Profit by Product
-    sorted_hist = sort_data(df, "OperatingProfit", sort_order)
-    fig12 = px.histogram(sorted_hist, x="Product", y="OperatingProfit", nbins=50, 
-                         color="Product", color_discrete_map={product: color for product, color in zip(sorted_hist["Product"].unique(), px.colors.qualitative.Antique)})
-
-    _, col12 = st.columns([0.1, 1])
-    with col12:
-        st.subheader("Distribution of Operating Profit by Product")
-        st.plotly_chart(fig12, use_container_width=True)
-
-    _, view10, dwn10 = st.columns([0.5, 0.45, 0.45])
-    with view10:
-        result7 = sorted_hist[["Product", "OperatingProfit"]]
-        expander = st.expander("View data for Distribution of Operating Profit by Product")
-        expander.write(result7)
-
-    with dwn10:
-        st.download_button("Get Data", data=result7.to_csv().encode("utf-8"),
-                           file_name="Distribution_of_Operating_Profit_by_Product.csv", mime="text/csv")
-
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if the 'Product' or 'OperatingProfit' columns exist in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+    st.divider()
 
+    perf.start("product_profit")
+    try:
+        # Histogram: Distribution of Operating Profit by Product, pre-binned per product
+        sorted_hist, fig12 = chart_output(tasks, "product_profit_bar")
 
-st.divider()
+        _, col12 = st.columns([0.1, 1])
+        with col12:
+            st.subheader("Distribution of Operating Profit by Product")
+            show_chart(fig12)
+
+        _, view10, dwn10 = st.columns([0.5, 0.45, 0.45])
+        with view10:
+            result7 = sorted_hist
+            expander = st.expander("View data for Distribution of Operating Profit by Product")
+            expander.write(result7)
+
+        with dwn10:
+            st.download_button("Get Data", data=deferred_export(dataset, result7, "Distribution_of_Operating_Profit_by_Product.csv", variant=export_variant),
+                               file_name="Distribution_of_Operating_Profit_by_Product.csv", mime="text/csv")
+
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if the 'Product' or 'OperatingProfit' columns exist in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
 
-try:
-    # Box plot
-    sorted_box_plot = sort_data(df, "TotalSales", sort_order)
-    fig13 = px.box(sorted_box_plot, x="Retailer", y="TotalSales", title="Boxplot of Total Sales by Retailer",
-                   color="Retailer", color_discrete_map={product: color for product, color in zip(sorted_box_plot["Retailer"].unique(), px.colors.qualitative.Antique)})
-    st.plotly_chart(fig13, use_container_width=True)
 
     st.divider()
 
-    # Bubble chart
-    sorted_bubble_chart = sort_data(df, "Region", sort_order)
-    fig14 = px.scatter(sorted_bubble_chart, x="Product", y="Region", size="UnitsSold", color="Product",
-                       title="Bubble Chart of Units Sold by Product and Region")
-    st.plotly_chart(fig14, use_container_width=True)
+    perf.start("retailer_box_and_bubble")
+    try:
+        # Box plot from quartiles, whiskers and outliers precomputed on the server
+        _, fig13 = chart_output(tasks, "retailer_box")
+        show_chart(fig13)
 
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if the required columns exist in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+        st.divider()
 
+        # Bubble chart, one bubble per Product and Region
+        _, fig14 = chart_output(tasks, "product_region_bubble")
+        show_chart(fig14)
 
-st.divider()
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if the required columns exist in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
 
 
-try:
-    # Area Chart: Total Sales by Month
-    df["Month_Year"] = df["InvoiceDate"].dt.strftime("%b'%y")
-    result = df.groupby(by="Month_Year")["TotalSales"].sum().reset_index()
-    sorted_result = sort_data(result, "TotalSales", sort_order)
-
-    fig15 = px.area(sorted_result, x="Month_Year", y="TotalSales")
-
-    _, col13 = st.columns([0.1, 1])
-    with col13:
-        st.subheader("Area Chart of Total Sales by Month")
-        st.plotly_chart(fig15, use_container_width=True)
-
-    _, view12, dwn12 = st.columns([0.5, 0.45, 0.45])
-    with view12:
-        result8 = sorted_result
-        expander = st.expander("View data for Area Chart of Total Sales by Month")
-        expander.write(result8)
-
-    with dwn12:
-        st.download_button("Get Data", data=result8.to_csv().encode("utf-8"),
-                           file_name="Area_Chart_of_Total_Sales_by_Month.csv", mime="text/csv")
-
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if the 'InvoiceDate' or 'TotalSales' columns exist in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+    st.divider()
 
 
-st.divider()
+    perf.start("monthly_area")
+    try:
+        # Area Chart: Total Sales per period, in date order
+        series, fig15 = chart_output(tasks, "monthly_area")
+        sorted_result = sort_data(series[["Period", "TotalSales"]], "TotalSales", sort_order)
 
-try:
-    # Create a highlight table
-    highlight_table = sorted_result.style.format({"TotalSales": "${:,.2f}M"}).highlight_max(axis=0, props="background-color:cyan;color:black;")
-    fig16 = go.Figure(data=[go.Table(
-        header=dict(values=["Month_Year", "TotalSales"],
-                    line_color='darkslategray',
-                    fill_color='lightskyblue',
-                    align='left'),
-        cells=dict(values=[sorted_result["Month_Year"], sorted_result["TotalSales"]],
-                   line_color='darkslategray',
-                   fill_color='lightcyan',
-                   align='left'))
-    ])
-    
-    _, col14 = st.columns([0.1, 1])
-    with col14:
-        st.subheader("Highlight Table of Total Sales by Month")
-        st.table(highlight_table)
-
-    _, view13, dwn13 = st.columns([0.5, 0.45, 0.45])
-    with view13:
-        result9 = sorted_result
-        expander = st.expander("View data for Highlight Table of Total Sales by Month") 
-        expander.write(result9)
-
-    with dwn13:
-        st.download_button("Get Data", data=result9.to_csv().encode("utf-8"),
-                           file_name="Highlight_Table_of_Total_Sales_by_Month.csv", mime="text/csv")
-
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if the 'Month_Year' or 'TotalSales' columns exist in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+        _, col13 = st.columns([0.1, 1])
+        with col13:
+            st.subheader(f"Area Chart of Total Sales ({granularity})")
+            show_chart(fig15)
 
+        _, view12, dwn12 = st.columns([0.5, 0.45, 0.45])
+        with view12:
+            result8 = sorted_result
+            expander = st.expander("View data for Area Chart of Total Sales by Month")
+            expander.write(result8)
 
-st.divider()
+        with dwn12:
+            st.download_button("Get Data", data=deferred_export(dataset, result8, "Area_Chart_of_Total_Sales_by_Month.csv", variant=time_variant),
+                               file_name="Area_Chart_of_Total_Sales_by_Month.csv", mime="text/csv")
 
-try:
-    # Create a word cloud 
-    wordcloud_df = df["Product"].value_counts().reset_index()
-    wordcloud_df.columns = ["Product", "Frequency"]
-
-    # Apply sorting based on the selected order
-    wordcloud_df = sort_data(wordcloud_df, "Frequency", sort_order)
-
-    # Generate the word cloud
-    wordcloud = WordCloud(width=800, height=400, random_state=21, max_font_size=110).generate_from_frequencies(wordcloud_df.set_index("Product")["Frequency"])
-
-    plt.figure(figsize=(10, 5))
-    plt.imshow(wordcloud, interpolation="bilinear")
-    plt.axis("off")
-    plt.title(f"Word Cloud of Products - {sort_order} Order")
-
-    _, col15 = st.columns([0.1, 1])
-    with col15:
-        st.subheader("Word Cloud of Products")
-        st.pyplot(plt)
-
-    _, view14, dwn14 = st.columns([0.5, 0.45, 0.45])
-    with view14:
-        expander = st.expander(f"View data for Word Cloud of Products")
-        expander.write(wordcloud_df)
-
-    with dwn14:
-        st.download_button("Get Data", data=wordcloud_df.to_csv().encode("utf-8"),
-                           file_name=f"WordCloud_of_Products_{sort_order}.csv", mime="text/csv")
-
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if the 'Product' column exists in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if the 'InvoiceDate' or 'TotalSales' columns exist in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
 
-st.divider()
 
-try:
-    # Define the nodes and links for the Sankey diagram
-    nodes = dict(
-        label = ["Retailer", "Region", "City", "Product", "Sales"],
-        color = "blue",
-        pad = 15,
-        thickness = 20,
-        line = dict(color = "black", width = 0.5)
-    )
-
-    links = dict(
-        source = [0, 1, 2, 3], # indices correspond to labels, eg A1, A2, etc.
-        target = [4, 4, 4, 4],
-        value = [df["TotalSales"].sum(), df["TotalSales"].sum(), df["TotalSales"].sum(), df["TotalSales"].sum()]
-    )
-
-    # Create the Sankey diagram
-    fig = go.Figure(data=[go.Sankey(
-        node = nodes,
-        link = links
-    )])
-
-    # Update the layout
-    fig.update_layout(title_text="Sankey Diagram of Adidas Sales", font_size=16)
-    fig.show()
-
-    # Display the Sankey diagram in the Streamlit app
-    _, col16 = st.columns([0.1, 1])
-    with col16:
-        st.plotly_chart(fig, use_container_width=True)
-
-    # Add a download button for the Sankey diagram data
-    _, view15, dwn15 = st.columns([0.5, 0.45, 0.45])
-    with view15:
-        expander = st.expander("View data for Sankey Diagram of Adidas Sales")
-        expander.write(df[["Retailer", "Region", "City", "Product", "TotalSales"]])
-
-    with dwn15:
-        st.download_button("Get Data", data=df[["Retailer", "Region", "City", "Product", "TotalSales"]].to_csv().encode("utf-8"),
-                           file_name="Sankey_Diagram_of_Adidas_Sales.csv", mime="text/csv")
+    st.divider()
+
+    perf.start("monthly_highlight_table")
+    try:
+        # Create a highlight table, with the change against the same period one year earlier
+        yoy_table = sort_data(backend.time_series().yoy(granularity), "TotalSales", sort_order)
+        highlight_table = (yoy_table.style
+                           .format({"TotalSales": "${:,.2f}M", "Prior Year": "${:,.2f}M", "YoY %": "{:+.1f}%"}, na_rep="")
+                           .highlight_max(axis=0, props="background-color:cyan;color:black;"))
+        fig16 = go.Figure(data=[go.Table(
+            header=dict(values=["Period", "TotalSales"],
+                        line_color='darkslategray',
+                        fill_color='lightskyblue',
+                        align='left'),
+            cells=dict(values=[yoy_table["Period"], yoy_table["TotalSales"]],
+                       line_color='darkslategray',
+                       fill_color='lightcyan',
+                       align='left'))
+        ])
+
+        _, col14 = st.columns([0.1, 1])
+        with col14:
+            st.subheader(f"Highlight Table of Total Sales ({granularity}, vs. prior year)")
+            st.table(highlight_table)
+
+        _, view13, dwn13 = st.columns([0.5, 0.45, 0.45])
+        with view13:
+            result9 = yoy_table
+            expander = st.expander("View data for Highlight Table of Total Sales by Month") 
+            expander.write(result9)
+
+        with dwn13:
+            st.download_button("Get Data", data=deferred_export(dataset, result9, "Highlight_Table_of_Total_Sales_by_Month.csv", variant=time_variant),
+                               file_name="Highlight_Table_of_Total_Sales_by_Month.csv", mime="text/csv")
+
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if the 'Period' or 'TotalSales' columns exist in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
+
 
     st.divider()
 
-    # Add a section to view and download raw sales data
-    _, view15, dwn15 = st.columns([0.5, 0.45, 0.45])
-    with view15:
-        expander = st.expander("View Sales Raw Data")
-        expander.write(df)
+    perf.start("word_cloud")
+    try:
+        # Word cloud rendered to PNG by its task, once per dataset version and filters (wordcloud and
+        # matplotlib are only imported once it first runs)
+        cloud = task_output(tasks, "word_cloud")
+        wordcloud_df = sort_data(backend.product_sales()[["Product", "Frequency"]], "Frequency", sort_order)
+
+        _, col15 = st.columns([0.1, 1])
+        with col15:
+            # The sort order only orders the table; the image is the same for both
+            st.subheader(f"Word Cloud of Products - {sort_order} Order")
+            st.image(cloud, width="stretch")
+            perf.add_payload(len(cloud))
+
+        _, view14, dwn14 = st.columns([0.5, 0.45, 0.45])
+        with view14:
+            expander = st.expander(f"View data for Word Cloud of Products")
+            expander.write(wordcloud_df)
+
+        with dwn14:
+            st.download_button("Get Data", data=deferred_export(dataset, wordcloud_df, f"WordCloud_of_Products_{sort_order}.csv", variant=filter_variant),
+                               file_name=f"WordCloud_of_Products_{sort_order}.csv", mime="text/csv")
+
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if the 'Product' column exists in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data types or format of the values.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
+
+
+chart_sections()
 
-    with dwn15:
-        st.download_button("Get Raw Data", data=df.to_csv().encode("utf-8"),
-                           file_name="SalesRawData.csv", mime="text/csv")
+st.divider()
 
-except KeyError as e:
-    st.error(f"Key error: {e}. Please check if all necessary columns are present in the dataset.")
-except ValueError as e:
-    st.error(f"Value error: {e}. There might be an issue with the data values or their format.")
-except Exception as e:
-    st.error(f"An unexpected error occurred: {e}")
+# Sankey diagram; changing its levels reruns only this fragment
+@st.fragment
+def sankey_section():
+    perf.start("sankey")
+    try:
+        # Sankey diagram: sales flowing through the chosen levels, in selection order; each level keeps its
+        # top SANKEY_TOP_N values and merges the rest into "Other"
+        levels = st.multiselect("Sankey levels", options=DIMENSIONS, default=config.SANKEY_LEVELS, key="sankey_levels")
+        if len(levels) < 2:
+            st.info("Choose at least two levels for the Sankey diagram.")
+        else:
+            nodes, links = cached_output("sankey_flows", lambda: sankey_flows(backend.dimension_sales(levels), levels))
+            fig = cached_figure("sankey", figures.sales_sankey, nodes, links)
+
+            # Display the Sankey diagram in the Streamlit app
+            _, col16 = st.columns([0.1, 1])
+            with col16:
+                show_chart(fig)
+
+            # Add a download button for the Sankey diagram data
+            sankey_variant = "-".join(part for part in ("_".join(levels), filter_variant) if part)
+            _, view15, dwn15 = st.columns([0.5, 0.45, 0.45])
+            with view15:
+                expander = st.expander("View data for Sankey Diagram of Adidas Sales")
+                expander.write(links[["From", "To", "TotalSales"]])
+
+            with dwn15:
+                st.download_button("Get Data",
+                                   data=deferred_export(dataset, lambda: links[["From", "To", "TotalSales"]],
+                                                        "Sankey_Diagram_of_Adidas_Sales.csv", variant=sankey_variant),
+                                   file_name="Sankey_Diagram_of_Adidas_Sales.csv", mime="text/csv")
+
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if all necessary columns are present in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data values or their format.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
+
+
+sankey_section()
+
+st.divider()
+
+# The filtered rows themselves, for the raw data explorer and the data profile below; the charts above only
+# read the backend's aggregates
+df = backend.dataset.df
+
+# Raw data explorer: the rows stay on the server and only the current page is sent to the browser. Sorting,
+# filtering and paging rerun only this fragment; the row order of each sort/filter is cached (raw_data.py).
+@st.fragment
+def raw_data_section():
+    perf.start("raw_data")
+    try:
+        expander = st.expander("View Sales Raw Data")
+        sort_col, order_col, filter_col, query_col = expander.columns(4)
+        sort_column = sort_col.selectbox("Sort by", options=[None] + list(df.columns), key="raw_sort_column",
+                                         format_func=lambda column: "File order" if column is None else column)
+        raw_order = order_col.radio("Order", options=["Ascending", "Descending"], key="raw_sort_order")
+        filter_column = filter_col.selectbox("Filter column", options=[None] + list(df.columns),
+                                             key="raw_filter_column",
+                                             format_func=lambda column: "None" if column is None else column)
+        query = None
+        if filter_column is not None:
+            bounds = value_range(df, filter_column)
+            if bounds is not None:
+                if bounds[0] < bounds[1]:
+                    query = query_col.slider("Range", min_value=bounds[0], max_value=bounds[1], value=bounds)
+            else:
+                query = query_col.text_input("Contains", key="raw_query")
+
+        positions = view_positions(df, (dataset.version, filter_variant), sort_column, raw_order,
+                                   filter_column, query)
+        size_col, page_col, info_col = expander.columns(3)
+        size = size_col.selectbox("Rows per page", options=PAGE_SIZES, index=1, key="raw_page_size")
+        # No key: a new page count (other filter or page size) starts again at page 1
+        page = page_col.number_input("Page", min_value=1, max_value=page_count(positions, size), value=1)
+        rows = page_rows(df, positions, page, size)
+        info_col.caption(f"Rows {(page - 1) * size + min(1, len(rows)):,}-{(page - 1) * size + len(rows):,} "
+                         f"of {len(positions):,}")
+        expander.dataframe(rows)
+        perf.add_rows(len(rows))
+
+        _, _, dwn15 = st.columns([0.5, 0.45, 0.45])
+        with dwn15:
+            raw_format = st.selectbox("Raw data format", options=list(EXPORT_FORMATS),
+                                      format_func=lambda fmt: EXPORT_FORMATS[fmt][0])
+            st.download_button("Get Raw Data", data=deferred_export(dataset, df, "SalesRawData.csv", raw_format, variant=filter_variant),
+                               file_name=export_name("SalesRawData.csv", raw_format), mime=export_mime(raw_format))
+
+    except KeyError as e:
+        st.error(f"Key error: {e}. Please check if all necessary columns are present in the dataset.")
+    except ValueError as e:
+        st.error(f"Value error: {e}. There might be an issue with the data values or their format.")
+    except Exception as e:
+        st.error(f"An unexpected error occurred: {e}")
+    finally:
+        perf.end()
+
+
+raw_data_section()
 
 st.divider()
 
+# Statistics, memory use and missing values of the filtered data; reused until the data or filters change.
+# Statistics, missing values and the correlation heatmap share the backend's single-scan column moments.
+def data_profile():
+    return {"statistics": backend.statistics(),
+            "memory_mb": df.memory_usage(deep=True).sum() / (1024 * 1024),
+            "missing": backend.moments().missing}
+
 # Display basic statistics
+perf.start("data_profile")
+profile = cached_output("data_profile", data_profile)
 st.header("Basic Statistics")
-st.write(df.describe())
+st.write(profile["statistics"])
 st.divider()
 
 st.header("First 5 rows of the DataFrame")
@@ -579,11 +762,56 @@ st.write(df.shape)
 st.divider()
 
 st.header("Memory usage of each column")
-memory_usage = df.memory_usage(deep=True).sum() / (1024 * 1024)
-st.write(f"Memory usage: {memory_usage:.2f} MB")
+st.write(f"Memory usage: {profile['memory_mb']:.2f} MB")
+if dataset.memory_report is not None:
+    # Recorded for the full dataset when the typed schema was applied at load time
+    report = dataset.memory_report
+    st.write(f"Full dataset: {report['MB before'].sum():.2f} MB before typed schema, "
+             f"{report['MB after'].sum():.2f} MB after")
+    st.write(report)
 st.divider()
 
 st.header("Number of missing values in each column of the DataFrame")
-st.write(df.isnull().sum())
+st.write(profile["missing"])
+
+perf.end()
+mark("full_render")
+
+# Optional per-section performance panel for this run and this process; toggling it reruns only the panel
+@st.fragment
+def performance_panel():
+    if st.toggle("Performance"):
+        with st.expander("Performance", expanded=True):
+            st.write("This run")
+            st.dataframe(perf.table(), hide_index=True)
+            if perf.tasks is not None:
+                st.write("Chart tasks of the last chart run (built concurrently, collected in page order)")
+                summary = perf.tasks.summary()
+                if summary is not None:
+                    st.caption(f"{summary['tasks']} tasks, {summary['build_ms']:.1f} ms of building done "
+                               f"{summary['elapsed_ms']:.1f} ms after submission")
+                st.dataframe(perf.tasks.timings(), hide_index=True)
+            st.write("All runs in this process (most expensive first)")
+            st.dataframe(process_summary(), hide_index=True)
+
+with st.sidebar:
+    performance_panel()
+
+# Time to first chart and lazy import costs of the first run in this process
+with st.sidebar.expander("Startup"):
+    report = startup_report()
+    for name, ms in report["marks_ms"].items():
+        st.write(f"{name}: {ms:.0f} ms after script start")
+    for name, ms in report["lazy_imports_ms"].items():
+        st.write(f"import {name}: {ms:.0f} ms (lazy)")
+
+# Shared cache counters for this process
+with st.sidebar.expander("Cache"):
+    cache_stats = shared_cache.stats()
+    st.write(f"{cache_stats['entries']} entries, {cache_stats['bytes'] / (1024 * 1024):.1f} of "
+             f"{cache_stats['max_bytes'] / (1024 * 1024):.0f} MB")
+    st.write(f"Hits: {cache_stats['hits']}, misses: {cache_stats['misses']}, "
+             f"evictions: {cache_stats['evictions']} ({cache_stats['hit_rate']:.0%} hit rate), "
+             f"waits on a build in progress: {cache_stats['waits']}")
 
 
@@ -0,0 +1,391 @@
+import copy
+import datetime
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import config
+from cube import DIMENSIONS, get_cube
+from data_loader import load_dataset, parquet_snapshot
+from filters import FILTER_COLUMNS, filter_dataset, is_active, make_filters
+from moments import QUANTILES, Moments, column_quantiles
+from timeseries import TimeSeries, daily_totals
+
+# DuckDB column types summarised by statistics(), matching pandas' numeric dtypes
+NUMERIC_TYPES = {"TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT",
+                 "UINTEGER", "UBIGINT", "FLOAT", "DOUBLE", "DECIMAL"}
+
+# Rows of DataFrame.describe() over numeric and datetime columns; datetime columns have no std
+DESCRIBE_ROWS = ["count", "mean", "min", "25%", "50%", "75%", "max", "std"]
+
+# Filtered backends, least recently used first. They hold the filter's row bitmap and aggregates; the
+# filtered rows themselves live in the shared cache (filters.FilteredDataset)
+_filtered = OrderedDict()
+_filtered_lock = threading.Lock()
+
+CORR_COLUMNS = ["PriceperUnit", "UnitsSold", "TotalSales", "OperatingProfit", "OperatingMargin"]
+
+
+# Aggregations behind the dashboard charts; every backend returns the same frames
+class QueryBackend:
+    name = None
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.version = dataset.version
+        self._time_series = None
+        self._moments = None
+
+    # Backend restricted to the rows matching the filters, cached per filter combination (LRU)
+    def filtered(self, filters):
+        if not is_active(filters):
+            return self
+        key = (self.name, self.version, filters)
+        with _filtered_lock:
+            backend = _filtered.get(key)
+            if backend is not None:
+                _filtered.move_to_end(key)
+                return backend
+
+        backend = self._filtered(filter_dataset(self.dataset, filters), filters)
+        with _filtered_lock:
+            _filtered[key] = backend
+            while len(_filtered) > config.FILTER_CACHE_SIZE:
+                _filtered.popitem(last=False)
+        return backend
+
+    def _filtered(self, dataset, filters):
+        raise NotImplementedError
+
+    # Retailer, TotalSales
+    def retailer_sales(self):
+        raise NotImplementedError
+
+    # Day, TotalSales, UnitsSold, OperatingProfit, Rows, in date order
+    def daily_sales(self):
+        raise NotImplementedError
+
+    # Daily totals are fetched once; every granularity, rolling and YoY view is resampled from them
+    def time_series(self):
+        if self._time_series is None:
+            self._time_series = TimeSeries(self.daily_sales())
+        return self._time_series
+
+    # Column moments and missing values from one scan of the rows (or the stored moments of an appended dataset);
+    # statistics, correlations and the data profile all read from them
+    def moments(self):
+        if self._moments is None:
+            stored = self.dataset.aggregates or {}
+            self._moments = (Moments.from_frame(stored["moments"]) if "moments" in stored
+                             else Moments.of_frame(self.dataset.df))
+        return self._moments
+
+    # State, TotalSales, UnitsSold
+    def state_sales(self):
+        raise NotImplementedError
+
+    # Region, City, TotalSales
+    def region_city_sales(self):
+        raise NotImplementedError
+
+    # City, TotalSales
+    def city_sales(self):
+        raise NotImplementedError
+
+    # Product, TotalSales, OperatingProfit, Frequency (number of invoice rows)
+    def product_sales(self):
+        raise NotImplementedError
+
+    # Product, Region, UnitsSold
+    def product_region_units(self):
+        raise NotImplementedError
+
+    # The given dimensions (any of cube.DIMENSIONS, in that order), TotalSales
+    def dimension_sales(self, dims=DIMENSIONS):
+        raise NotImplementedError
+
+    def correlation(self, columns=CORR_COLUMNS):
+        raise NotImplementedError
+
+    # Same layout as DataFrame.describe(): the numeric and datetime columns
+    def statistics(self):
+        raise NotImplementedError
+
+
+# In-memory pandas backend: rollups come from the cached sales cube
+class PandasBackend(QueryBackend):
+    name = "pandas"
+
+    def __init__(self, dataset):
+        super().__init__(dataset)
+        stored = dataset.aggregates or {}
+        self.cube = get_cube(self.df, self.version, stored.get("cube"))
+
+    # Read through the dataset rather than kept, so a cached filtered backend does not pin its rows
+    @property
+    def df(self):
+        return self.dataset.df
+
+    def _filtered(self, dataset, filters):
+        return PandasBackend(dataset)
+
+    def retailer_sales(self):
+        return self.cube.rollup("retailer", ["Retailer", "TotalSales"])
+
+    def daily_sales(self):
+        stored = self.dataset.aggregates or {}
+        return stored["daily"] if "daily" in stored else daily_totals(self.df)
+
+    def state_sales(self):
+        return self.cube.rollup("state", ["State", "TotalSales", "UnitsSold"])
+
+    def region_city_sales(self):
+        return self.cube.rollup("region_city", ["Region", "City", "TotalSales"])
+
+    def city_sales(self):
+        return self.cube.rollup("city", ["City", "TotalSales"])
+
+    def product_sales(self):
+        return (self.cube.rollup("product", ["Product", "TotalSales", "OperatingProfit", "Rows"])
+                    .rename(columns={"Rows": "Frequency"}))
+
+    def product_region_units(self):
+        return self.cube.rollup("product_region", ["Product", "Region", "UnitsSold"])
+
+    def dimension_sales(self, dims=DIMENSIONS):
+        _check_dimensions(dims)
+        return self.cube.rollup_by(dims, list(dims) + ["TotalSales"])
+
+    def correlation(self, columns=CORR_COLUMNS):
+        return self.moments().correlation(columns)
+
+    def statistics(self):
+        moments = self.moments()
+        numeric = moments.statistics(column_quantiles(self.df, moments.columns))
+        dates = {column: [values.count(), values.mean(), values.min(), *values.quantile(QUANTILES), values.max()]
+                 for column, values in self.df.select_dtypes("datetime").items()}
+        return _describe(numeric, dates, self.df.columns)
+
+
+# Embedded DuckDB backend: scans the Parquet snapshot lazily, in parallel across cores
+class DuckDBBackend(QueryBackend):
+    name = "duckdb"
+
+    def __init__(self, dataset, threads=config.DUCKDB_THREADS):
+        super().__init__(dataset)
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("The 'duckdb' backend requires the duckdb package (pip install duckdb).") from e
+
+        self.path = parquet_snapshot(dataset)
+        self.con = duckdb.connect()
+        if threads:
+            self.con.execute(f"SET threads TO {int(threads)}")
+        self.con.execute(f"CREATE VIEW sales AS SELECT * FROM read_parquet({_quote(self.path)})")
+        # Relation queried by the aggregations; filtered backends swap in a WHERE clause
+        self.table = "sales"
+        # A DuckDB connection must not be used from several threads at once
+        self._lock = threading.Lock()
+
+    # Shares the connection; the filter is pushed down into the Parquet scan
+    def _filtered(self, dataset, filters):
+        backend = copy.copy(self)
+        backend.dataset = dataset
+        backend.version = dataset.version
+        backend._time_series = None
+        backend._moments = None
+        backend.table = f"(SELECT * FROM sales WHERE {_where(filters)}) AS sales"
+        return backend
+
+    def query(self, sql):
+        with self._lock:
+            return self.con.execute(sql).df()
+
+    def _sum_by(self, dims, measures=("TotalSales",)):
+        keys = ", ".join(f'"{d}"' for d in dims)
+        sums = ", ".join(f'SUM("{m}")::{"BIGINT" if m == "UnitsSold" else "DOUBLE"} AS "{m}"' for m in measures)
+        return self.query(f"SELECT {keys}, {sums} FROM {self.table} GROUP BY ALL ORDER BY {keys}")
+
+    def retailer_sales(self):
+        return self._sum_by(["Retailer"])
+
+    def daily_sales(self):
+        return self.query(f"""
+            SELECT date_trunc('day', "InvoiceDate")::TIMESTAMP AS "Day", SUM("TotalSales")::DOUBLE AS "TotalSales",
+                   SUM("UnitsSold")::BIGINT AS "UnitsSold", SUM("OperatingProfit")::DOUBLE AS "OperatingProfit",
+                   COUNT(*)::BIGINT AS "Rows"
+            FROM {self.table} GROUP BY ALL ORDER BY "Day"
+        """)
+
+    def state_sales(self):
+        return self._sum_by(["State"], ("TotalSales", "UnitsSold"))
+
+    def region_city_sales(self):
+        return self._sum_by(["Region", "City"])
+
+    def city_sales(self):
+        return self._sum_by(["City"])
+
+    def product_sales(self):
+        return self.query(f"""
+            SELECT "Product", SUM("TotalSales")::DOUBLE AS "TotalSales",
+                   SUM("OperatingProfit")::DOUBLE AS "OperatingProfit", COUNT(*)::BIGINT AS "Frequency"
+            FROM {self.table} GROUP BY ALL ORDER BY "Product"
+        """)
+
+    def product_region_units(self):
+        return self._sum_by(["Product", "Region"], ("UnitsSold",))
+
+    def dimension_sales(self, dims=DIMENSIONS):
+        _check_dimensions(dims)
+        return self._sum_by(list(dims))
+
+    def correlation(self, columns=CORR_COLUMNS):
+        pairs = ", ".join(f'corr("{a}", "{b}")' for a in columns for b in columns)
+        values = self.query(f"SELECT {pairs} FROM {self.table}").iloc[0].to_numpy(dtype=float)
+        return pd.DataFrame(values.reshape(len(columns), len(columns)), index=columns, columns=columns)
+
+    def statistics(self):
+        schema = list(self.query("DESCRIBE sales")[["column_name", "column_type"]].itertuples(index=False))
+        columns = [name for name, dtype in schema if dtype.split("(")[0] in NUMERIC_TYPES]
+        date_columns = [name for name, dtype in schema if dtype.startswith("TIMESTAMP") or dtype == "DATE"]
+        stats = {"count": "COUNT({c})::DOUBLE", "mean": "AVG({c})::DOUBLE", "std": "STDDEV_SAMP({c})::DOUBLE",
+                 "min": "MIN({c})::DOUBLE", "25%": "QUANTILE_CONT({c}, 0.25)::DOUBLE", "50%": "QUANTILE_CONT({c}, 0.5)::DOUBLE",
+                 "75%": "QUANTILE_CONT({c}, 0.75)::DOUBLE", "max": "MAX({c})::DOUBLE"}
+        select = ", ".join(expr.format(c=f'"{c}"') for c in columns for expr in stats.values())
+        values = self.query(f"SELECT {select} FROM {self.table}").iloc[0].to_numpy(dtype=float)
+        numeric = pd.DataFrame(values.reshape(len(columns), len(stats)).T, index=list(stats), columns=columns)
+
+        # Dates are summarised as nanoseconds since the epoch, then turned back into Timestamps
+        date_stats = ["COUNT({c})::DOUBLE", "AVG(epoch_ns({c}::TIMESTAMP_NS))::DOUBLE",
+                      "MIN(epoch_ns({c}::TIMESTAMP_NS))::DOUBLE"]
+        date_stats += [f"QUANTILE_CONT(epoch_ns({{c}}::TIMESTAMP_NS), {q})::DOUBLE" for q in QUANTILES]
+        date_stats += ["MAX(epoch_ns({c}::TIMESTAMP_NS))::DOUBLE"]
+        dates = {}
+        if date_columns:
+            select = ", ".join(expr.format(c=f'"{c}"') for c in date_columns for expr in date_stats)
+            values = self.query(f"SELECT {select} FROM {self.table}").iloc[0].to_numpy(dtype=float)
+            for column, row in zip(date_columns, values.reshape(len(date_columns), len(date_stats))):
+                dates[column] = [int(row[0])] + [pd.Timestamp(round(value)) if not np.isnan(value) else pd.NaT
+                                                 for value in row[1:]]
+        return _describe(numeric, dates, [name for name, _ in schema])
+
+
+# describe() layout of numeric statistics and of datetime columns ({column: [count, mean, min, quartiles...,
+# max]}), in frame column order. Without datetime columns pandas keeps std second, as the numeric frame has it.
+def _describe(numeric, dates, columns):
+    if not dates:
+        return numeric
+    stats = {}
+    for column in columns:
+        if column in dates:
+            stats[column] = pd.Series(list(dates[column]) + [np.nan], index=DESCRIBE_ROWS, dtype=object)
+        elif column in numeric.columns:
+            stats[column] = numeric[column].reindex(DESCRIBE_ROWS)
+    return pd.DataFrame(stats)
+
+
+def _check_dimensions(dims):
+    unknown = [dim for dim in dims if dim not in DIMENSIONS]
+    if unknown or len(set(dims)) != len(dims) or not dims:
+        raise ValueError(f"Invalid dimensions {list(dims)}. Choose distinct values from: {', '.join(DIMENSIONS)}")
+
+
+def _quote(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+# SQL condition equivalent to FilterIndex.select()
+def _where(filters):
+    clauses = []
+    for field, column in FILTER_COLUMNS.items():
+        chosen = getattr(filters, field)
+        if chosen:
+            clauses.append(f'"{column}" IN ({", ".join(_quote(value) for value in chosen)})')
+    if filters.start is not None:
+        clauses.append(f'"InvoiceDate" >= TIMESTAMP {_quote(filters.start.isoformat())}')
+    if filters.end is not None:
+        clauses.append(f'"InvoiceDate" < TIMESTAMP {_quote((filters.end + datetime.timedelta(days=1)).isoformat())}')
+    return " AND ".join(clauses) or "TRUE"
+
+
+BACKENDS = {
+    PandasBackend.name: PandasBackend,
+    DuckDBBackend.name: DuckDBBackend,
+}
+
+_backends = {}
+_lock = threading.Lock()
+
+
+# Backend instance for a dataset version, shared across reruns and sessions
+def get_backend(dataset, name="pandas", **options):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown query backend '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    key = (name, dataset.version)
+    backend = _backends.get(key)
+    if backend is None:
+        with _lock:
+            backend = _backends.get(key)
+            if backend is None:
+                for old in [k for k in _backends if k[0] == name]:
+                    _backends.pop(old)
+                backend = BACKENDS[name](dataset, **options)
+                _backends[key] = backend
+    return backend
+
+
+# Frames compared by compare_backends, by method name
+CHECKS = ["retailer_sales", "daily_sales", "state_sales", "region_city_sales", "city_sales",
+          "product_sales", "product_region_units", "dimension_sales", "correlation", "statistics"]
+
+
+def _normalize(frame):
+    frame = frame.copy()
+    for column in frame.columns:
+        if frame[column].dtype == object and frame[column].map(lambda value: isinstance(value, pd.Timestamp)).any():
+            # Date statistics are compared as nanoseconds, within the tolerance
+            frame[column] = frame[column].map(lambda value: value.value if isinstance(value, pd.Timestamp)
+                                              else value).astype(float)
+        elif isinstance(frame[column].dtype, pd.CategoricalDtype) or frame[column].dtype == object:
+            frame[column] = frame[column].astype(str)
+    return frame
+
+
+# Run every aggregation on two backends and raise AssertionError on any difference
+def compare_backends(left, right, rtol=1e-9):
+    timings = {}
+    for method in CHECKS:
+        start = time.perf_counter()
+        expected = getattr(left, method)()
+        middle = time.perf_counter()
+        actual = getattr(right, method)()
+        timings[method] = (middle - start, time.perf_counter() - middle)
+        try:
+            pd.testing.assert_frame_equal(_normalize(expected), _normalize(actual),
+                                          check_dtype=False, check_exact=False, rtol=rtol)
+        except AssertionError as e:
+            raise AssertionError(f"{method}: {left.name} and {right.name} disagree\n{e}") from e
+    return timings
+
+
+# Verify both backends return identical results: python backends.py [file]
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "Adidas.xlsx"
+    dataset = load_dataset(source)
+    pandas_backend = get_backend(dataset, "pandas")
+    duckdb_backend = get_backend(dataset, "duckdb")
+    timings = compare_backends(pandas_backend, duckdb_backend)
+    print(f"Rows: {len(dataset.df):,}  backends agree on {len(timings)} aggregations")
+    sample = make_filters(datetime.date(2021, 1, 1), datetime.date(2021, 6, 30),
+                          retailers=["Walmart", "West Gear"], products=["Men's Street Footwear"])
+    compare_backends(pandas_backend.filtered(sample), duckdb_backend.filtered(sample))
+    print(f"Filtered ({len(pandas_backend.filtered(sample).dataset.df):,} rows): backends agree")
+    print(f"{'aggregation':<20}{'pandas ms':>12}{'duckdb ms':>12}")
+    for method, (left, right) in timings.items():
+        print(f"{method:<20}{left * 1000:12.2f}{right * 1000:12.2f}")
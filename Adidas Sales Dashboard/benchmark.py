@@ -0,0 +1,229 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, "app.py")
+
+# Named dataset sizes for --sizes
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Charts bucketing high-cardinality labels into top N plus "Other" (their builders take top_n)
+BUCKETED_CHARTS = {"state_combo", "region_city_treemap", "city_pie"}
+
+
+def synthetic_path(rows, folder):
+    return os.path.join(folder, f"synthetic-{rows}.parquet")
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+# Aggregation + figure build time, figure JSON size and bytes saved of each chart section, outside Streamlit.
+# The charts are the app's own (charts.chart_specs / BUILDERS), aggregated from a cold shared cache.
+def time_sections(dataset):
+    from backends import get_backend
+    from cache import shared_cache
+    from charts import BUILDERS, chart_specs
+
+    import config
+    shared_cache.clear()
+    backend, backend_ms = _timed(get_backend, dataset, config.BACKEND)
+    # Also builds the daily time series behind the sales-over-time charts
+    specs, specs_ms = _timed(chart_specs, backend)
+
+    results = {"backend_build": {"ms": backend_ms}, "chart_specs": {"ms": specs_ms}}
+    for name, (_, aggregate, _) in specs.items():
+        build = BUILDERS[name]
+        data, aggregate_ms = _timed(aggregate)
+        fig, build_ms = _timed(build, data)
+        payload, serialize_ms = _timed(fig.to_json)
+        # Bytes saved by top-N bucketing, against the figure of all the data
+        full = build(data, top_n=0) if name in BUCKETED_CHARTS else build(data)
+        results[name] = {"aggregate_ms": aggregate_ms, "build_ms": build_ms, "serialize_ms": serialize_ms,
+                         "payload_bytes": len(payload), "saved_bytes": len(full.to_json()) - len(payload)}
+    _, statistics_ms = _timed(backend.statistics)
+    results["statistics"] = {"aggregate_ms": statistics_ms}
+    return results
+
+
+# Every chart task of the page (aggregation + figure), run one after another and then on the section
+# pool (scheduler.py), each time from a cold shared cache. On a multi-core host the pool's elapsed_ms approaches
+# the slowest task rather than the sum of all of them (build_ms).
+def time_chart_tasks(dataset):
+    from backends import get_backend
+    from cache import shared_cache
+    from charts import BUILDERS, chart_specs
+    from scheduler import SectionTasks, get_pool
+
+    import config
+    specs = chart_specs(get_backend(dataset, config.BACKEND))
+
+    def build(name, data):
+        return lambda: BUILDERS[name](data())
+
+    results = {}
+    for mode, pool in (("sequential", None), ("pool", get_pool(0))):
+        shared_cache.clear()
+        tasks = SectionTasks(pool)
+        for name, (_, data, _) in specs.items():
+            tasks.submit(name, build(name, data))
+        for name in specs:
+            tasks.result(name)
+        results[mode] = dict(tasks.summary(), tasks=tasks.timings())
+    return results
+
+
+# Bytes sent to the browser per chart and per table in a finished AppTest run
+def payloads(app):
+    charts = []
+    for i, element in enumerate(app.get("plotly_chart")):
+        spec = element.proto.spec
+        layout = json.loads(spec).get("layout", {})
+        title = layout.get("title", {}).get("text") if isinstance(layout.get("title"), dict) else layout.get("title")
+        charts.append({"index": i, "title": title, "bytes": len(spec.encode("utf-8"))})
+    # Data frames and static tables, as serialized for the browser
+    tables = sum(len(element.proto.SerializeToString()) for element in list(app.dataframe) + list(app.table))
+    return {"charts": charts, "chart_bytes": sum(chart["bytes"] for chart in charts), "table_bytes": tables}
+
+
+# One benchmark run against a data file; executed in a fresh interpreter so every run starts cold
+def run_worker(data_path, reruns):
+    from streamlit.testing.v1 import AppTest
+    from data_loader import load_dataset
+
+    app = AppTest.from_file(APP, default_timeout=3600)
+    _, cold_ms = _timed(app.run)
+    errors = [element.value for element in app.exception] + [element.value for element in app.error]
+
+    warm = [_timed(app.run)[1] for _ in range(reruns)]
+    app.radio[0].set_value("Descending")
+    _, sort_ms = _timed(app.run)
+
+    # Sections are timed on a reloaded dataset with cold figure caches
+    dataset = load_dataset(data_path)
+    return {
+        "rows": len(dataset.df),
+        "full_run_cold_ms": cold_ms,
+        "full_rerun_warm_ms": warm,
+        "full_rerun_warm_median_ms": sorted(warm)[len(warm) // 2] if warm else None,
+        "sort_toggle_rerun_ms": sort_ms,
+        "sections": time_sections(dataset),
+        "chart_tasks": time_chart_tasks(dataset),
+        "payloads": payloads(app),
+        "errors": errors,
+    }
+
+
+def run_size(rows, folder, reruns):
+    from synthetic_data import generate
+
+    path = synthetic_path(rows, folder)
+    if not os.path.exists(path):
+        print(f"Generating {rows:,} synthetic rows -> {path}", file=sys.stderr)
+        generate(rows, path)
+    env = dict(os.environ, SALES_DATA_PATH=path)
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", path, "--reruns", str(reruns)],
+                            cwd=HERE, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark worker failed for {rows:,} rows:\n{result.stderr[-4000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+# Flatten the metrics compared between two result files: {(size, metric): value}
+def _metrics(results):
+    flat = {}
+    for size, result in results["results"].items():
+        flat[(size, "full_run_cold_ms")] = result["full_run_cold_ms"]
+        flat[(size, "full_rerun_warm_median_ms")] = result["full_rerun_warm_median_ms"]
+        flat[(size, "sort_toggle_rerun_ms")] = result["sort_toggle_rerun_ms"]
+        flat[(size, "chart_bytes")] = result["payloads"]["chart_bytes"]
+        if "chart_tasks" in result:
+            flat[(size, "chart_tasks.pool_elapsed_ms")] = result["chart_tasks"]["pool"]["elapsed_ms"]
+        for section, entry in result["sections"].items():
+            for metric, value in entry.items():
+                # Higher is better here; not a regression metric
+                if metric == "saved_bytes":
+                    continue
+                flat[(size, f"{section}.{metric}")] = value
+    return flat
+
+
+# Metrics that got worse than the baseline by more than threshold (0.2 = 20%) and by at least min_delta
+def compare(baseline, current, threshold=0.2, min_delta=5.0):
+    before = _metrics(baseline)
+    after = _metrics(current)
+    regressions = []
+    for key, value in after.items():
+        old = before.get(key)
+        if old and value is not None and value > old * (1 + threshold) and value - old >= min_delta:
+            regressions.append((key[0], key[1], old, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark of the sales dashboard.")
+    parser.add_argument("--sizes", nargs="+", default=["10k", "1m"], help=f"Dataset sizes: {', '.join(SIZES)}")
+    parser.add_argument("--reruns", type=int, default=3, help="Warm reruns timed per size")
+    parser.add_argument("--data-dir", default=os.path.join(HERE, ".cache", "bench"))
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Previous results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    parser.add_argument("--min-delta", type=float, default=5.0, help="Ignore changes smaller than this (ms or bytes)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.reruns)))
+        return
+
+    results = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": {},
+    }
+    for size in args.sizes:
+        rows = SIZES[size] if size in SIZES else int(size)
+        result = run_size(rows, args.data_dir, args.reruns)
+        results["results"][size] = result
+        print(f"{size:>6}: cold {result['full_run_cold_ms']:9.0f} ms, warm rerun "
+              f"{result['full_rerun_warm_median_ms']:9.0f} ms, sort toggle {result['sort_toggle_rerun_ms']:9.0f} ms, "
+              f"charts {result['payloads']['chart_bytes'] / 1024:8.1f} KB"
+              + (f", {len(result['errors'])} errors" if result["errors"] else ""))
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold, args.min_delta)
+        for size, metric, old, new in regressions:
+            print(f"REGRESSION {size} {metric}: {old:.1f} -> {new:.1f}")
+        if regressions:
+            sys.exit(1)
+
+
+# python benchmark.py --sizes 10k 1m 10m [--compare previous.json]
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+import config
+
+
+# Rough in-memory size of a cached value, in bytes
+def estimate_size(value):
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(estimate_size(item) for item in value.values())
+    if hasattr(value, "to_plotly_json"):
+        # Plotly figures: their data arrays dominate
+        return estimate_size(value.to_plotly_json().get("data", []))
+    return sys.getsizeof(value)
+
+
+# Process-wide LRU cache shared by every session, bounded by a memory budget
+class SharedCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Keys being built, each with the Future its other callers wait on
+        self._building = {}
+        self.waits = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, size=None):
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            if key in self._items:
+                self.bytes -= self._items.pop(key)[1]
+            # Values larger than the whole budget are returned but never stored
+            if size > self.max_bytes:
+                return value
+            self._items[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    # Cached value for key, built (outside the lock) on a miss. Concurrent misses on the same key build it
+    # once: the first caller builds, the others wait for its result (or its exception).
+    def get_or_build(self, key, build, size=None):
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                return item[0]
+            future = self._building.get(key)
+            owner = future is None
+            if owner:
+                future = self._building[key] = Future()
+            else:
+                self.waits += 1
+        if not owner:
+            return future.result()
+        try:
+            value = self.put(key, build(), size)
+            future.set_result(value)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+        return value
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "waits": self.waits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared by every session served by this process
+shared_cache = SharedCache(config.CACHE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,81 @@
+import config
+import figures
+from backends import CORR_COLUMNS
+from binning import box_stats, cached_result, density_grid, density_table
+from flows import sankey_flows
+
+# Figure builder of each chart, looked up by name (also inside report.py's worker processes)
+BUILDERS = {
+    "retailer_bar": figures.retailer_bar,
+    "monthly_line": lambda data: figures.monthly_line(*data),
+    "state_combo": figures.state_combo,
+    "region_city_treemap": figures.region_city_treemap,
+    "city_pie": figures.city_pie,
+    "product_donut": figures.product_donut,
+    "correlation_heatmap": figures.correlation_heatmap,
+    "density_heatmap": lambda data: figures.density_heatmap(*data),
+    "product_profit_bar": figures.product_profit_bar,
+    "retailer_box": lambda data: figures.retailer_box(*data),
+    "product_region_bubble": figures.product_region_bubble,
+    "monthly_area": figures.monthly_area,
+    "sankey": lambda data: figures.sales_sankey(*data),
+}
+
+
+def sort_data(df, column, order):
+    return df.sort_values(by=column, ascending=(order == "Ascending"))
+
+
+# Every chart of the dashboard, in page order: name -> (title, data, table). data() aggregates through the
+# query backend (shared by the dashboard sections and report.py); table(data) is the frame shown under the
+# chart, data itself when None. data() only reads the backend, so the charts can be aggregated concurrently.
+def chart_specs(backend, sort_order="Ascending", granularity="Monthly", sankey_levels=config.SANKEY_LEVELS):
+    time_series = backend.time_series()
+
+    def by_sales(frame):
+        return sort_data(frame, "TotalSales", sort_order)
+
+    def treemap_data():
+        data = by_sales(backend.region_city_sales())
+        data["TotalSales (Formatted)"] = figures.lakh_labels(data["TotalSales"])
+        return data
+
+    # Binned on the server once per dataset version and filters; the rows are only read on a miss
+    def density_data():
+        return cached_result(backend.version, ("density", "PriceperUnit", "UnitsSold"),
+                             lambda: density_grid(backend.dataset.df, "PriceperUnit", "UnitsSold"))
+
+    def box_data():
+        stats, outliers = cached_result(backend.version, ("box", "Retailer", "TotalSales"),
+                                        lambda: box_stats(backend.dataset.df, "Retailer", "TotalSales"))
+        return sort_data(stats, "median", sort_order), outliers
+
+    def series_table(data):
+        series = data[0] if isinstance(data, tuple) else data
+        return by_sales(series[["Period", "TotalSales"]])
+
+    return {
+        "retailer_bar": ("Total Sales by Retailer", lambda: by_sales(backend.retailer_sales()), None),
+        "monthly_line": ("Total Sales Over Time",
+                         lambda: (time_series.resample(granularity), time_series.rolling(granularity)), series_table),
+        "state_combo": ("Total Sales and Units Sold by State", lambda: by_sales(backend.state_sales()), None),
+        "region_city_treemap": ("Total Sales by Region and City", treemap_data, None),
+        "city_pie": ("Total Sales by City", lambda: by_sales(backend.city_sales()), None),
+        "product_donut": ("Sales Share by Product",
+                          lambda: by_sales(backend.product_sales()[["Product", "TotalSales"]]), None),
+        "correlation_heatmap": ("Correlation Heatmap of Sales Data", lambda: backend.correlation(CORR_COLUMNS), None),
+        "density_heatmap": ("Units Sold vs Price per Unit", density_data,
+                            lambda data: sort_data(density_table(*data, "PriceperUnit", "UnitsSold"), "UnitsSold",
+                                                   sort_order)),
+        "product_profit_bar": ("Distribution of Operating Profit by Product",
+                               lambda: sort_data(backend.product_sales()[["Product", "OperatingProfit"]],
+                                                 "OperatingProfit", sort_order), None),
+        "retailer_box": ("Boxplot of Total Sales by Retailer", box_data, lambda data: data[0]),
+        "product_region_bubble": ("Units Sold by Product and Region",
+                                  lambda: sort_data(backend.product_region_units(), "Region", sort_order), None),
+        "monthly_area": (f"Area Chart of Total Sales ({granularity})", lambda: time_series.resample(granularity),
+                         series_table),
+        "sankey": ("Sankey Diagram of Adidas Sales",
+                   lambda: sankey_flows(backend.dimension_sales(sankey_levels), sankey_levels),
+                   lambda data: data[1][["From", "To", "TotalSales"]]),
+    }
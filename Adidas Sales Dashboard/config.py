@@ -0,0 +1,44 @@
+import os
+
+# Dashboard settings, overridable through environment variables
+
+# Sales data file loaded by the dashboard
+DATA_PATH = os.environ.get("SALES_DATA_PATH", "Adidas.xlsx")
+
+# Drop folder for new sales batches (workbooks, CSV or Parquet) appended by ingest.py
+INCOMING_DIR = os.environ.get("SALES_INCOMING_DIR", "incoming")
+
+# Seconds between background checks for a changed data file or new batches (0 = check on every rerun instead)
+REFRESH_SECONDS = float(os.environ.get("SALES_REFRESH_SECONDS", "5"))
+
+# Query backend used for the aggregated charts: "pandas" or "duckdb"
+BACKEND = os.environ.get("SALES_BACKEND", "pandas").lower()
+
+# Filter combinations whose aggregates are kept in memory (least recently used are evicted)
+FILTER_CACHE_SIZE = int(os.environ.get("SALES_FILTER_CACHE_SIZE", "32"))
+
+# Memory budget of the process-wide cache shared by all sessions (figures, binned data)
+CACHE_MAX_MB = int(os.environ.get("SALES_CACHE_MAX_MB", "256"))
+
+# File receiving one JSON line per dashboard section per run (empty = disabled)
+PERF_LOG = os.environ.get("SALES_PERF_LOG", "")
+
+# Default levels of the Sankey diagram, comma separated, in flow order (any of the cube dimensions)
+SANKEY_LEVELS = [level.strip() for level in
+                 os.environ.get("SALES_SANKEY_LEVELS", "Retailer,Region,Product").split(",") if level.strip()]
+
+# Nodes kept per Sankey level; the remaining values are merged into an "Other" node
+SANKEY_TOP_N = int(os.environ.get("SALES_SANKEY_TOP_N", "10"))
+
+# Categories drawn individually by the City and State charts; the rest are merged into "Other" (0 = all)
+CHART_TOP_N = int(os.environ.get("SALES_CHART_TOP_N", "20"))
+
+# Worker processes parsing workbook sheets and batch files in parallel (0 = one per core)
+INGEST_WORKERS = int(os.environ.get("SALES_INGEST_WORKERS", "0"))
+
+# Threads aggregating and building the dashboard charts concurrently (0 = one per core, 1 = one after another
+# in page order, as a baseline for the task timings)
+SECTION_WORKERS = int(os.environ.get("SALES_SECTION_WORKERS", "0"))
+
+# Worker threads for the DuckDB backend (0 lets DuckDB use every core)
+DUCKDB_THREADS = int(os.environ.get("SALES_DUCKDB_THREADS", "0"))
@@ -0,0 +1,108 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Finest grain kept in the cube; every chart rollup is derived from it (time is handled by timeseries.py)
+DIMENSIONS = ["Retailer", "Region", "State", "City", "Product"]
+MEASURES = ["TotalSales", "UnitsSold", "OperatingProfit"]
+
+# Rollups served to the dashboard charts
+ROLLUPS = {
+    "retailer": ["Retailer"],
+    "state": ["State"],
+    "region_city": ["Region", "City"],
+    "city": ["City"],
+    "product": ["Product"],
+    "product_region": ["Product", "Region"],
+}
+
+# Number of dataset versions whose cubes are kept in memory
+MAX_CUBES = 4
+
+_cubes = {}
+_lock = threading.Lock()
+
+
+class SalesCube:
+    def __init__(self, base, version=None):
+        self.base = base
+        self.version = version
+        self.rollups = {name: self._rollup(dims) for name, dims in ROLLUPS.items()}
+        # Rollups over other dimension combinations, built on first use
+        self._adhoc = {}
+
+    def _rollup(self, dims):
+        result = self.base.groupby(dims, observed=True)[MEASURES + ["Rows"]].sum().reset_index()
+        # Rollups are small: plain labels keep chart ordering under the caller's control
+        for dim in dims:
+            if isinstance(result[dim].dtype, pd.CategoricalDtype):
+                result[dim] = result[dim].astype(str)
+        return result
+
+    def rollup(self, name, columns=None):
+        result = self.rollups[name]
+        return result[columns] if columns is not None else result
+
+    # Rollup over any combination of dimensions, in the given order
+    def rollup_by(self, dims, columns=None):
+        result = self._adhoc.get(tuple(dims))
+        if result is None:
+            result = self._adhoc.setdefault(tuple(dims), self._rollup(list(dims)))
+        return result[columns] if columns is not None else result
+
+    @property
+    def groups(self):
+        return len(self.base)
+
+
+# Measures are summed in 64-bit even when the loaded columns were downcast
+def measure_frame(df):
+    return pd.DataFrame({
+        column: df[column].astype(np.int64 if pd.api.types.is_integer_dtype(df[column].dtype) else np.float64,
+                                  copy=False)
+        for column in MEASURES
+    })
+
+
+# One scan over the raw rows: a single groupby at the finest grain, all rollups derived from it
+def build_cube(df, version=None):
+    keys = [df[column] for column in DIMENSIONS]
+    base = (measure_frame(df).groupby(keys, observed=True, sort=False)
+              .agg(TotalSales=("TotalSales", "sum"),
+                   UnitsSold=("UnitsSold", "sum"),
+                   OperatingProfit=("OperatingProfit", "sum"),
+                   Rows=("TotalSales", "size"))
+              .reset_index())
+    return SalesCube(base, version)
+
+
+# Cube base of two row sets from their cube bases alone, e.g. stored rows plus an appended batch
+def merge_bases(left, right):
+    combined = {}
+    for column in DIMENSIONS:
+        values = [left[column], right[column]]
+        if all(isinstance(value.dtype, pd.CategoricalDtype) for value in values):
+            combined[column] = union_categoricals(values, sort_categories=True)
+        else:
+            combined[column] = pd.concat(values, ignore_index=True)
+    for column in MEASURES + ["Rows"]:
+        combined[column] = pd.concat([left[column], right[column]], ignore_index=True)
+    return (pd.DataFrame(combined).groupby(DIMENSIONS, observed=True, sort=False)[MEASURES + ["Rows"]]
+              .sum().reset_index())
+
+
+# Cube for a dataset version, built on first use (or from a stored base) and shared by later reruns
+def get_cube(df, version, base=None):
+    cube = _cubes.get(version)
+    if cube is not None:
+        return cube
+    with _lock:
+        cube = _cubes.get(version)
+        if cube is None:
+            cube = SalesCube(base, version) if base is not None else build_cube(df, version)
+            _cubes[version] = cube
+            while len(_cubes) > MAX_CUBES:
+                _cubes.pop(next(iter(_cubes)))
+        return cube
@@ -0,0 +1,382 @@
+import datetime
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+# Snapshots live next to the source file so every replica sharing a volume reuses them
+CACHE_DIR_NAME = ".cache"
+
+# File types accepted as a source file or an appended batch
+SOURCE_TYPES = (".xlsx", ".xlsm", ".xls", ".csv", ".parquet")
+
+# Types read in chunks by workbooks.read_files instead of in one piece
+STREAMED_TYPES = (".xlsx", ".xlsm", ".csv")
+
+# Typed schema applied at load time
+CATEGORY_COLUMNS = ["Retailer", "Region", "State", "City", "Product", "SalesMethod"]
+DATE_COLUMNS = ["InvoiceDate"]
+
+# Loaded frames are kept per process, keyed by source path
+_loaded = {}
+_lock = threading.Lock()
+
+
+class Dataset:
+    def __init__(self, df, source, version, load_kind, load_seconds, memory_report=None, batches=(),
+                 aggregates=None, modified=None, read_stats=None, snapshot=None):
+        self._df = df
+        self.source = source
+        self.version = version
+        # "workbook" (parsed + snapshot written), "snapshot" (memory-mapped) or "memory" (already loaded)
+        self.load_kind = load_kind
+        self.load_seconds = load_seconds
+        # Per-column dtype and memory before/after the typed schema, recorded when the snapshot was built
+        self.memory_report = memory_report
+        # Manifest entries of the batches appended to the source file by ingest.py
+        self.batches = list(batches)
+        # Aggregates stored by ingest.py for this version ({"cube": ..., "daily": ...}), so they are not rebuilt
+        self.aggregates = aggregates
+        # When the data last changed: modification time of the source file or of the latest appended batch
+        self.modified = modified
+        # Parse statistics of the source (sheets, rows, seconds, rows per second) when this version was read
+        # from the workbook or CSV rather than a snapshot (see workbooks.read_files)
+        self.read_stats = read_stats
+        # Arrow snapshot of the source rows (without the appended batches), None when not loaded from one
+        self.snapshot = snapshot
+
+    # The rows; a filtered dataset (filters.FilteredDataset) takes them from its parent when first read
+    @property
+    def df(self):
+        return self._df
+
+    @property
+    def rows(self):
+        return len(self.df)
+
+
+# Cheap signature used to notice that the source file changed without reading it
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+# Content hash of the source file, used as the dataset version
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def snapshot_path(path, version, suffix=".arrow"):
+    folder = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(folder, f"{stem}-{version}{suffix}")
+
+
+# Folder holding the batches appended to a source file, their manifest and the aggregates of each version
+def batch_folder(path):
+    folder = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(folder, f"{stem}-batches")
+
+
+def _manifest_path(path):
+    return os.path.join(batch_folder(path), "manifest.json")
+
+
+def read_manifest(path):
+    try:
+        with open(_manifest_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"batches": []}
+
+
+def write_manifest(path, manifest):
+    target = _manifest_path(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, target)
+
+
+def _manifest_signature(path):
+    try:
+        return file_signature(_manifest_path(path))
+    except OSError:
+        return None
+
+
+# Changes whenever the source file is replaced or a batch is appended to it
+def dataset_signature(path):
+    return file_signature(path), _manifest_signature(path)
+
+
+def _modified(signature):
+    times = [part[1] for part in signature if part is not None]
+    return datetime.datetime.fromtimestamp(max(times) / 1e9)
+
+
+# Version after appending batches: each batch's content hash is chained onto the previous version
+def combined_version(version, batches):
+    for batch in batches:
+        version = hashlib.sha1(f"{version}+{batch['hash']}".encode()).hexdigest()[:16]
+    return version
+
+
+def aggregate_path(path, version, name):
+    return os.path.join(batch_folder(path), f"{name}-{version}.arrow")
+
+
+def _read_aggregates(path, version):
+    aggregates = {}
+    for name in ("cube", "daily", "moments"):
+        target = aggregate_path(path, version, name)
+        if os.path.exists(target):
+            aggregates[name] = feather.read_table(target, memory_map=True).to_pandas()
+    # The cube and daily totals are only used together
+    if "cube" not in aggregates or "daily" not in aggregates:
+        return None
+    return aggregates
+
+
+# Source rows followed by the appended batch segments; numeric types are widened where the batches need it
+def _append_segments(df, path, batches):
+    tables = [pa.Table.from_pandas(df, preserve_index=False)]
+    for batch in batches:
+        if batch.get("segment"):
+            tables.append(feather.read_table(os.path.join(batch_folder(path), batch["segment"]), memory_map=True))
+    if len(tables) == 1:
+        return df
+    df = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+    # Merged dictionaries list new values last; keep categories sorted as astype("category") does
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].cat.reorder_categories(sorted(df[column].cat.categories))
+    return df
+
+
+# Source rows with the typed schema applied, the memory report and the read statistics (None for types read
+# whole). Workbooks and CSV files are streamed in chunks, their sheets parsed in parallel (see workbooks.py).
+def read_typed(path):
+    if path.lower().endswith(STREAMED_TYPES):
+        from workbooks import read_file
+        df, before, stats = read_file(path)
+        return apply_schema(df, before) + (stats,)
+    return apply_schema(read_source(path)) + (None,)
+
+
+def read_source(path):
+    if path.lower().endswith((".xlsx", ".xlsm", ".xls")):
+        return pd.read_excel(path)
+    if path.lower().endswith(".csv"):
+        return pd.read_csv(path, parse_dates=["InvoiceDate"])
+    if path.lower().endswith(".parquet"):
+        return pd.read_parquet(path)
+    raise ValueError(f"Unsupported data file type: {path}")
+
+
+# Downcast a numeric column only when every value survives the round trip
+def _downcast(column):
+    if pd.api.types.is_integer_dtype(column.dtype):
+        return pd.to_numeric(column, downcast="integer")
+    if pd.api.types.is_float_dtype(column.dtype) and column.dtype != np.float32:
+        values = column.to_numpy()
+        narrowed = values.astype(np.float32)
+        if np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(narrowed, index=column.index, name=column.name)
+    return column
+
+
+# Categorical dimensions, downcast numerics and datetime64 dates, plus a before/after memory report.
+# before (dtype and bytes per column) describes the untyped rows when they were typed while being read.
+def apply_schema(df, before=None):
+    if before is None:
+        before = pd.DataFrame({"dtype": df.dtypes.astype(str), "bytes": df.memory_usage(deep=True, index=False)})
+    typed = {}
+    for column in df.columns:
+        values = df[column]
+        if column in CATEGORY_COLUMNS:
+            values = values.astype("category")
+        elif column in DATE_COLUMNS:
+            values = pd.to_datetime(values)
+        elif pd.api.types.is_numeric_dtype(values.dtype):
+            values = _downcast(values)
+        typed[column] = values
+    typed = pd.DataFrame(typed)
+
+    report = pd.DataFrame({
+        "dtype before": before["dtype"],
+        "dtype after": typed.dtypes.astype(str),
+        "MB before": before["bytes"] / (1024 * 1024),
+        "MB after": typed.memory_usage(deep=True, index=False) / (1024 * 1024),
+    })
+    return typed, report
+
+
+def _report_path(snapshot):
+    return os.path.splitext(snapshot)[0] + ".json"
+
+
+def _read_report(snapshot):
+    try:
+        with open(_report_path(snapshot)) as f:
+            return pd.read_json(f, orient="split")
+    except (OSError, ValueError):
+        return None
+
+
+def _write_report(report, snapshot):
+    with open(_report_path(snapshot), "w") as f:
+        f.write(report.to_json(orient="split"))
+
+
+# Remove snapshots of older versions of the same source file
+def _prune_snapshots(path, keep):
+    folder = os.path.dirname(keep)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    current = os.path.splitext(os.path.basename(keep))[0]
+    for name in os.listdir(folder):
+        full = os.path.join(folder, name)
+        if name.startswith(f"{stem}-") and not name.startswith(current) and os.path.isfile(full):
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+
+def write_snapshot(df, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Write under a temporary name first so readers never see a half-written snapshot
+    tmp = f"{target}.{os.getpid()}.tmp"
+    # Uncompressed Arrow IPC so later loads can be memory-mapped
+    feather.write_feather(df, tmp, compression="uncompressed")
+    os.replace(tmp, target)
+
+
+# Parquet copy of a loaded dataset for engines that scan files lazily (e.g. DuckDB). It is streamed from the
+# memory-mapped Arrow snapshot of the source and the appended segments, one record batch at a time, rather
+# than converted from the loaded frame.
+def parquet_snapshot(dataset):
+    if dataset.source.lower().endswith(".parquet") and not dataset.batches:
+        return dataset.source
+    target = snapshot_path(dataset.source, dataset.version, ".parquet")
+    if not os.path.exists(target):
+        with _lock:
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                tmp = f"{target}.{os.getpid()}.tmp"
+                files = _arrow_files(dataset)
+                if files is None:
+                    dataset.df.to_parquet(tmp, index=False)
+                else:
+                    _write_parquet(files, tmp)
+                os.replace(tmp, target)
+    return target
+
+
+# Arrow files holding a dataset's rows in order: the source snapshot, then the appended segments. None when
+# the snapshot is gone (pruned after the source changed).
+def _arrow_files(dataset):
+    if dataset.snapshot is None or not os.path.exists(dataset.snapshot):
+        return None
+    return [dataset.snapshot] + [os.path.join(batch_folder(dataset.source), batch["segment"])
+                                 for batch in dataset.batches if batch.get("segment")]
+
+
+# Record batches of Arrow files into one Parquet file. Numeric types are widened where the files differ, as
+# _append_segments does; categorical columns are written as their values.
+def _write_parquet(files, target):
+    readers = [pa.ipc.open_file(pa.memory_map(file)) for file in files]
+    schemas = [pa.schema([field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field
+                          for field in reader.schema]) for reader in readers]
+    schema = pa.unify_schemas(schemas, promote_options="permissive")
+    with pq.ParquetWriter(target, schema) as writer:
+        for reader in readers:
+            for i in range(reader.num_record_batches):
+                rows = pa.Table.from_batches([reader.get_batch(i)])
+                writer.write_table(rows.select(schema.names).cast(schema))
+
+
+# The source file plus any batches appended by ingest.py; reloaded when either changes
+def load_dataset(path="Adidas.xlsx"):
+    start = time.perf_counter()
+    key = os.path.abspath(path)
+    signature = dataset_signature(path)
+
+    cached = _loaded.get(key)
+    if cached is not None and cached[0] == signature:
+        return reuse_dataset(cached[1], start)
+
+    with _lock:
+        cached = _loaded.get(key)
+        if cached is not None and cached[0] == signature:
+            return reuse_dataset(cached[1], start)
+
+        version = file_hash(path)
+        target = snapshot_path(path, version)
+        if os.path.exists(target):
+            df = feather.read_table(target, memory_map=True).to_pandas()
+            report = _read_report(target)
+            load_kind = "snapshot"
+            stats = None
+        else:
+            df, report, stats = read_typed(path)
+            write_snapshot(df, target)
+            _write_report(report, target)
+            _prune_snapshots(path, target)
+            load_kind = "workbook"
+
+        batches = read_manifest(path)["batches"]
+        aggregates = None
+        if batches:
+            df = _append_segments(df, path, batches)
+            version = combined_version(version, batches)
+            aggregates = _read_aggregates(path, version)
+
+        dataset = Dataset(df, key, version, load_kind, time.perf_counter() - start, report, batches, aggregates,
+                          _modified(signature), stats, target)
+        _loaded[key] = (signature, dataset)
+        return dataset
+
+
+# An already loaded dataset as served to another run: load kind "memory", timed from start
+def reuse_dataset(dataset, start):
+    return Dataset(dataset.df, dataset.source, dataset.version, "memory", time.perf_counter() - start,
+                   dataset.memory_report, dataset.batches, dataset.aggregates, dataset.modified, dataset.read_stats,
+                   dataset.snapshot)
+
+
+# Report cold, snapshot and warm load times: python data_loader.py [file]
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "Adidas.xlsx"
+    version = file_hash(source)
+    target = snapshot_path(source, version)
+    if os.path.exists(target):
+        os.remove(target)
+
+    cold = load_dataset(source)
+    _loaded.clear()
+    snapshot = load_dataset(source)
+    warm = load_dataset(source)
+
+    print(f"Rows: {len(cold.df):,}  version: {cold.version}")
+    for dataset in (cold, snapshot, warm):
+        print(f"{dataset.load_kind:>9}: {dataset.load_seconds * 1000:10.2f} ms")
+    if cold.read_stats is not None:
+        stats = cold.read_stats
+        print(f"Parsed {stats['rows']:,} rows from {stats['sheets']} sheet(s) at {stats['rows_per_second']:,.0f} rows/s")
+    report = cold.memory_report
+    print(f"Memory: {report['MB before'].sum():.2f} MB before typed schema, {report['MB after'].sum():.2f} MB after")
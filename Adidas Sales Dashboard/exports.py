@@ -0,0 +1,110 @@
+import gzip
+import os
+import shutil
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_loader import CACHE_DIR_NAME
+
+# Rows encoded per chunk when streaming an export to disk
+CHUNK_ROWS = 100_000
+
+# Export formats: label shown in the UI, file suffix and MIME type
+EXPORT_FORMATS = {
+    "csv": ("CSV", ".csv", "text/csv"),
+    "csv.gz": ("CSV (gzip)", ".csv.gz", "application/gzip"),
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+}
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path):
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+
+# Encode a frame as CSV one chunk of rows at a time
+def iter_csv(frame, chunk_rows=CHUNK_ROWS, index=True):
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        chunk = frame.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=index, header=(start == 0)).encode("utf-8")
+
+
+def write_export(frame, path, fmt="csv", chunk_rows=CHUNK_ROWS):
+    if fmt == "csv":
+        with open(path, "wb") as f:
+            for chunk in iter_csv(frame, chunk_rows):
+                f.write(chunk)
+    elif fmt == "csv.gz":
+        with gzip.open(path, "wb", compresslevel=6) as f:
+            for chunk in iter_csv(frame, chunk_rows):
+                f.write(chunk)
+    elif fmt == "parquet":
+        writer = None
+        try:
+            for start in range(0, max(len(frame), 1), chunk_rows):
+                table = pa.Table.from_pandas(frame.iloc[start:start + chunk_rows], preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def export_dir(dataset):
+    return os.path.join(os.path.dirname(dataset.source), CACHE_DIR_NAME, "exports", dataset.version)
+
+
+# Drop exports cached for other dataset versions
+def _prune_versions(folder):
+    parent = os.path.dirname(folder)
+    for name in os.listdir(parent):
+        full = os.path.join(parent, name)
+        if full != folder and os.path.isdir(full):
+            shutil.rmtree(full, ignore_errors=True)
+
+
+# Export file for (dataset version, file name, variant), written once and reused afterwards
+def export_file(dataset, frame, file_name, fmt="csv", variant=None):
+    folder = export_dir(dataset)
+    stem = os.path.splitext(file_name)[0]
+    if variant:
+        stem = f"{stem}-{variant}"
+    path = os.path.join(folder, stem + EXPORT_FORMATS[fmt][1])
+    if os.path.exists(path):
+        return path
+
+    with _lock_for(path):
+        if not os.path.exists(path):
+            if not os.path.isdir(folder):
+                os.makedirs(folder, exist_ok=True)
+                _prune_versions(folder)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            write_export(frame, tmp, fmt)
+            os.replace(tmp, path)
+    return path
+
+
+# Callable for st.download_button: nothing is encoded until the user clicks the button.
+# frame may itself be a callable so that column selections are only made on demand too.
+def deferred_export(dataset, frame, file_name, fmt="csv", variant=None):
+    def build():
+        data = frame() if callable(frame) else frame
+        with open(export_file(dataset, data, file_name, fmt, variant), "rb") as f:
+            return f.read()
+    return build
+
+
+def export_name(file_name, fmt):
+    return os.path.splitext(file_name)[0] + EXPORT_FORMATS[fmt][1]
+
+
+def export_mime(fmt):
+    return EXPORT_FORMATS[fmt][2]
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import config
+
+# Figure builders shared by the dashboard; each takes the already aggregated (and sorted) data
+
+# Label of the entry merging the values outside a chart's top N
+OTHER = "Other"
+
+
+
+def color_map(values):
+    return {value: color for value, color in zip(values.unique(), px.colors.qualitative.Antique)}
+
+
+# Keep the top_n labels by value and merge the rest into one "Other" row (one per group when given), in the
+# input order with "Other" last; 0 keeps every label. Numeric columns are summed.
+def bucket_top_n(frame, label, top_n=config.CHART_TOP_N, value="TotalSales", group=None):
+    if not top_n or frame[label].nunique() <= top_n + 1:
+        return frame
+    keep = frame[label].isin(frame.groupby(label, observed=True)[value].sum().nlargest(top_n).index)
+    measures = [column for column in frame.select_dtypes("number").columns if column not in (label, group)]
+    rest = frame.loc[~keep]
+    if group is None:
+        other = rest[measures].sum().to_frame().T
+    else:
+        other = rest.groupby(group, observed=True, sort=False)[measures].sum().reset_index()
+    other[label] = OTHER
+    return pd.concat([frame.loc[keep], other], ignore_index=True)[[c for c in frame.columns if c in other.columns]]
+
+
+# Sales in lakh as display labels ("12.34 Lakh"), formatted in one vectorized call; negative values get None
+def lakh_labels(values):
+    values = np.asarray(values, dtype=np.float64)
+    labels = np.char.mod("%.2f Lakh", values / 1_00_000).astype(object)
+    labels[~(values >= 0)] = None
+    return labels
+
+
+# Total Sales by Retailer
+def retailer_bar(sorted_df):
+    return px.bar(sorted_df, x="Retailer", y="TotalSales", labels={"TotalSales": "Total Sales {$}"},
+                  title="Total Sales by Retailer", hover_data=["TotalSales"],
+                  template="gridon", height=500, color="Retailer",
+                  color_discrete_map=color_map(sorted_df["Retailer"]))
+
+
+# Total Sales Over Time, in date order (see timeseries.TimeSeries.resample), with an optional rolling mean
+def monthly_line(series, rolling=None):
+    fig = px.line(series, x="Period", y="TotalSales", title="Total Sales Over Time", template="gridon")
+    if rolling is not None:
+        fig.add_scatter(x=series["Period"], y=rolling, mode="lines", name=rolling.name, line=dict(dash="dot"))
+    return fig
+
+
+# Total Sales and Units Sold by State (top states, the rest merged into "Other")
+def state_combo(sorted_result1, top_n=config.CHART_TOP_N):
+    sorted_result1 = bucket_top_n(sorted_result1, "State", top_n)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=sorted_result1["State"], y=sorted_result1["TotalSales"], name="Total Sales",
+                         marker_color=[px.colors.qualitative.Antique[i % len(px.colors.qualitative.Antique)]
+                                       for i in range(len(sorted_result1["State"]))]))
+    fig.add_trace(go.Scatter(x=sorted_result1["State"], y=sorted_result1["UnitsSold"], mode="lines",
+                             name="Units Sold", yaxis="y2"))
+    fig.update_layout(
+        title="Total Sales and Units Sold by State",
+        xaxis=dict(title="State"),
+        yaxis=dict(title="Total Sales", showgrid=False),
+        yaxis2=dict(title="Units Sold", overlaying="y", side="right"),
+        template="gridon",
+        legend=dict(x=1, y=1)
+    )
+    return fig
+
+
+# Total Sales by Region and City in Treemap (top cities, the rest merged into "Other" per region)
+def region_city_treemap(sorted_treemap, top_n=config.CHART_TOP_N):
+    sorted_treemap = bucket_top_n(sorted_treemap[["Region", "City", "TotalSales"]], "City", top_n, group="Region")
+    sorted_treemap["TotalSales (Formatted)"] = lakh_labels(sorted_treemap["TotalSales"])
+    fig = px.treemap(sorted_treemap, path=["Region", "City"], values="TotalSales",
+                     hover_name="TotalSales (Formatted)",
+                     hover_data=["TotalSales (Formatted)"],
+                     color="City", height=700, width=600)
+    fig.update_traces(textinfo="label+value")
+    return fig
+
+
+# Total Sales by City in Piechart (top cities, the rest merged into "Other")
+def city_pie(sorted_piechart, top_n=config.CHART_TOP_N):
+    sorted_piechart = bucket_top_n(sorted_piechart, "City", top_n)
+    fig = px.pie(sorted_piechart, values='TotalSales', names='City')
+    fig.update_layout(margin=dict(l=0, r=0, t=50, b=0))
+    return fig
+
+
+# Sales Share by Product in Donut Chart
+def product_donut(sorted_product_sales):
+    fig = px.pie(sorted_product_sales, values='TotalSales', names='Product', hole=.3,
+                 hover_data=['TotalSales'], labels={'TotalSales': 'Sales'})
+    fig.update_traces(textinfo='percent+label')
+    return fig
+
+
+# Correlation Heatmap
+def correlation_heatmap(corr):
+    return px.imshow(corr, text_auto=True, aspect="auto", color_continuous_scale='RdBu_r')
+
+
+# Units Sold vs Price per Unit as a 2D density grid (see binning.density_grid)
+def density_heatmap(counts, x_centers, y_centers, x="PriceperUnit", y="UnitsSold"):
+    fig = go.Figure(go.Heatmap(x=x_centers, y=y_centers, z=np.where(counts > 0, counts, np.nan).T,
+                               colorscale="Blues", colorbar=dict(title="Rows")))
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+# Operating Profit by Product, pre-binned per product
+def product_profit_bar(sorted_hist):
+    return px.bar(sorted_hist, x="Product", y="OperatingProfit",
+                  color="Product", color_discrete_map=color_map(sorted_hist["Product"]))
+
+
+# Box plot from precomputed quartiles, whiskers and outliers (see binning.box_stats)
+def retailer_box(sorted_box_plot, box_outliers):
+    colors = px.colors.qualitative.Antique
+    fig = go.Figure()
+    for i, box in enumerate(sorted_box_plot.to_dict("records")):
+        retailer = box["Retailer"]
+        fig.add_trace(go.Box(name=retailer, x=[retailer], q1=[box["q1"]], median=[box["median"]], q3=[box["q3"]],
+                             lowerfence=[box["lowerfence"]], upperfence=[box["upperfence"]],
+                             marker_color=colors[i % len(colors)], boxpoints=False))
+        if len(box_outliers[retailer]):
+            fig.add_trace(go.Scatter(x=[retailer] * len(box_outliers[retailer]), y=box_outliers[retailer], mode="markers",
+                                     marker_color=colors[i % len(colors)], name=retailer, showlegend=False))
+    fig.update_layout(title="Boxplot of Total Sales by Retailer", xaxis_title="Retailer", yaxis_title="TotalSales",
+                      template="gridon")
+    return fig
+
+
+# Bubble chart, one bubble per Product and Region
+def product_region_bubble(sorted_bubble_chart):
+    return px.scatter(sorted_bubble_chart, x="Product", y="Region", size="UnitsSold", color="Product",
+                      title="Bubble Chart of Units Sold by Product and Region")
+
+
+# Area Chart: Total Sales per period, in date order
+def monthly_area(series):
+    return px.area(series, x="Period", y="TotalSales")
+
+
+# Sankey Diagram of Adidas Sales: sales flowing through the levels of flows.sankey_flows
+def sales_sankey(nodes, links):
+    # One color per level; links take their source node's color, translucent
+    palette = px.colors.qualitative.Antique
+    level_colors = {level: palette[i % len(palette)] for i, level in enumerate(nodes["Level"].unique())}
+    node_colors = nodes["Level"].map(level_colors).to_numpy()
+    link_colors = [color.replace("rgb(", "rgba(").replace(")", ", 0.35)") for color in node_colors[links["Source"]]]
+    node = dict(
+        label=nodes["Node"].tolist(),
+        customdata=nodes["Level"].tolist(),
+        hovertemplate="%{customdata}: %{label}<br>Total Sales %{value:,.0f}<extra></extra>",
+        color=node_colors.tolist(),
+        pad=15,
+        thickness=20,
+        line=dict(color="black", width=0.5)
+    )
+    link = dict(
+        source=links["Source"].tolist(),
+        target=links["Target"].tolist(),
+        value=links["TotalSales"].round(2).tolist(),
+        color=link_colors
+    )
+    fig = go.Figure(data=[go.Sankey(node=node, link=link, valueformat=",.0f")])
+    fig.update_layout(title_text="Sankey Diagram of Adidas Sales", font_size=16)
+    return fig
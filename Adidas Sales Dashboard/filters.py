@@ -0,0 +1,153 @@
+import datetime
+import hashlib
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from cache import shared_cache
+from data_loader import Dataset
+
+# Filter fields and the dataset columns they select on
+FILTER_COLUMNS = {
+    "retailers": "Retailer",
+    "regions": "Region",
+    "states": "State",
+    "products": "Product",
+}
+
+# Invoice date range (inclusive dates, None = open) plus the values chosen for each column (empty = all)
+Filters = namedtuple("Filters", ["start", "end"] + list(FILTER_COLUMNS), defaults=[None, None] + [()] * len(FILTER_COLUMNS))
+
+NO_FILTERS = Filters()
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def is_active(filters):
+    return filters != NO_FILTERS
+
+
+# Short stable key for caches and export file names ("" when nothing is filtered)
+def filters_key(filters):
+    if not is_active(filters):
+        return ""
+    return hashlib.sha1(repr(tuple(filters)).encode("utf-8")).hexdigest()[:10]
+
+
+# Normalize widget values into a hashable Filters tuple
+def make_filters(start=None, end=None, **selections):
+    values = {field: tuple(sorted(str(v) for v in selections.get(field) or ())) for field in FILTER_COLUMNS}
+    return Filters(start, end, **values)
+
+
+class FilterIndex:
+    def __init__(self, df):
+        self.size = len(df)
+        self.values = {}
+        # column -> value -> packed row bitmap (1 bit per row)
+        self.bitmaps = {}
+        for column in FILTER_COLUMNS.values():
+            codes, uniques = pd.factorize(df[column], sort=True)
+            valid = codes >= 0
+            order = np.flatnonzero(valid)[np.argsort(codes[valid], kind="stable")]
+            counts = np.bincount(codes[valid], minlength=len(uniques))
+            bitmaps = {}
+            for value, positions in zip(uniques, np.split(order, np.cumsum(counts)[:-1])):
+                bitmaps[str(value)] = self._pack(positions)
+            self.values[column] = [str(value) for value in uniques]
+            self.bitmaps[column] = bitmaps
+
+        # Row positions ordered by invoice date, for binary-search range cuts
+        dates = df["InvoiceDate"].to_numpy()
+        self.date_order = np.argsort(dates, kind="stable")
+        self.sorted_dates = dates[self.date_order]
+
+    def _pack(self, positions):
+        bits = np.zeros(self.size, dtype=bool)
+        bits[positions] = True
+        return np.packbits(bits)
+
+    def date_range(self):
+        if not self.size:
+            return None, None
+        return pd.Timestamp(self.sorted_dates[0]).date(), pd.Timestamp(self.sorted_dates[-1]).date()
+
+    # Sorted row positions matching the filters, or None when every row matches
+    def select(self, filters):
+        bits = self.select_bits(filters)
+        if bits is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bits, count=self.size))
+
+    # Packed bitmap (1 bit per row) of the rows matching the filters, or None when every row matches
+    def select_bits(self, filters):
+        bits = None
+        for field, column in FILTER_COLUMNS.items():
+            chosen = getattr(filters, field)
+            if not chosen:
+                continue
+            column_bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+            for value in chosen:
+                if value in self.bitmaps[column]:
+                    column_bits |= self.bitmaps[column][value]
+            bits = column_bits if bits is None else bits & column_bits
+
+        low, high = 0, self.size
+        if filters.start is not None:
+            low = np.searchsorted(self.sorted_dates, np.datetime64(filters.start, "ns"), side="left")
+        if filters.end is not None:
+            end = np.datetime64(filters.end + datetime.timedelta(days=1), "ns")
+            high = np.searchsorted(self.sorted_dates, end, side="left")
+        if (low, high) != (0, self.size):
+            date_bits = self._pack(self.date_order[low:high])
+            bits = date_bits if bits is None else bits & date_bits
+        return bits
+
+
+# Filter index for a dataset version, built once and shared by every session
+def get_filter_index(dataset):
+    index = _indexes.get(dataset.version)
+    if index is None:
+        with _lock:
+            index = _indexes.get(dataset.version)
+            if index is None:
+                _indexes.clear()
+                index = FilterIndex(dataset.df)
+                _indexes[dataset.version] = index
+    return index
+
+
+# Dataset restricted to the filtered rows; its version extends the parent's so caches stay separate. Only
+# the packed row bitmap is kept (1 bit per parent row): the rows are taken from the parent when df is first
+# read and held in the shared cache, so its memory budget bounds them and the backends cached per filter
+# combination (backends.py) keep aggregates only. The DuckDB backend never reads them.
+class FilteredDataset(Dataset):
+    def __init__(self, parent, filters, bits):
+        super().__init__(None, parent.source, f"{parent.version}-{filters_key(filters)}", "filter",
+                         parent.load_seconds, modified=parent.modified)
+        self.parent = parent
+        self.bits = bits
+        self._rows = int(np.unpackbits(bits, count=len(parent.df)).sum())
+
+    def positions(self):
+        return np.flatnonzero(np.unpackbits(self.bits, count=len(self.parent.df)))
+
+    @property
+    def df(self):
+        return shared_cache.get_or_build(("filtered_rows", self.version),
+                                         lambda: self.parent.df.take(self.positions()))
+
+    # Counted from the bitmap, without taking the rows
+    @property
+    def rows(self):
+        return self._rows
+
+
+def filter_dataset(dataset, filters):
+    bits = get_filter_index(dataset).select_bits(filters)
+    if bits is None:
+        return dataset
+    return FilteredDataset(dataset, filters, bits)
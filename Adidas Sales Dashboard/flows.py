@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+import config
+
+# Label of the node collecting every value outside a level's top N
+OTHER = "Other"
+
+
+# Keep the top_n values of a level by weight (largest first) and fold the rest into OTHER.
+# Returns the node code of every row and the node labels.
+def prune_level(values, weights, top_n=config.SANKEY_TOP_N):
+    codes, uniques = pd.factorize(values, sort=True)
+    totals = np.bincount(codes, weights=weights, minlength=len(uniques))
+    order = np.argsort(-totals, kind="stable")
+    if top_n and len(uniques) > top_n + 1:
+        order = order[:top_n]
+        labels = [str(value) for value in uniques[order]] + [OTHER]
+    else:
+        labels = [str(value) for value in uniques[order]]
+    remap = np.full(len(uniques), len(order), dtype=np.int64)
+    remap[order] = np.arange(len(order))
+    return remap[codes], labels
+
+
+# Sankey flows through a chain of dimensions (e.g. Retailer -> Region -> Product) from sales grouped by
+# those dimensions. Every level is pruned to its top_n values plus OTHER, then the links between each
+# pair of adjacent levels are summed with one bincount over the grouped rows.
+# Returns nodes (Level, Node, TotalSales) and links (Source, Target, From, To, TotalSales); Source and
+# Target are positions in nodes.
+def sankey_flows(grouped, levels, value="TotalSales", top_n=config.SANKEY_TOP_N):
+    if len(levels) < 2:
+        raise ValueError("A Sankey diagram needs at least two levels.")
+    weights = grouped[value].to_numpy(dtype=np.float64)
+
+    codes, nodes, offset = [], [], 0
+    for level in levels:
+        level_codes, labels = prune_level(grouped[level], weights, top_n)
+        nodes.append(pd.DataFrame({
+            "Level": level,
+            "Node": labels,
+            value: np.bincount(level_codes, weights=weights, minlength=len(labels)),
+        }))
+        codes.append(level_codes + offset)
+        offset += len(labels)
+    nodes = pd.concat(nodes, ignore_index=True)
+
+    links = []
+    for source, target in zip(codes, codes[1:]):
+        # Pair code of every row; only the pairs that occur are kept
+        pairs = source * offset + target
+        unique_pairs, inverse = np.unique(pairs, return_inverse=True)
+        links.append(pd.DataFrame({
+            "Source": unique_pairs // offset,
+            "Target": unique_pairs % offset,
+            value: np.bincount(inverse, weights=weights, minlength=len(unique_pairs)),
+        }))
+    links = pd.concat(links, ignore_index=True)
+    labels = nodes["Node"].to_numpy()
+    links.insert(2, "From", labels[links["Source"]])
+    links.insert(3, "To", labels[links["Target"]])
+    return nodes, links
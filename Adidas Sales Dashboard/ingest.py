@@ -0,0 +1,166 @@
+import argparse
+import datetime
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from cube import build_cube, merge_bases
+from data_loader import (SOURCE_TYPES, aggregate_path, apply_schema, batch_folder, combined_version, file_hash,
+                         file_signature, load_dataset, read_manifest, write_manifest, write_snapshot)
+from moments import Moments
+from timeseries import daily_totals, merge_daily
+from workbooks import read_files
+
+# Fields identifying an invoice line. The data has no invoice number, so a line is identified by everything
+# except the amounts derived from it (TotalSales, OperatingProfit)
+INVOICE_KEY = ["Retailer", "RetailerID", "InvoiceDate", "Region", "State", "City", "Product", "PriceperUnit",
+               "UnitsSold", "OperatingMargin", "SalesMethod"]
+
+# One ingestion at a time per process; the manifest is the only shared state between processes
+_lock = threading.Lock()
+
+
+# 64-bit hash of each row's invoice key; numbers are widened first so downcast columns hash alike
+def key_hashes(df):
+    columns = {}
+    for column in INVOICE_KEY:
+        values = df[column]
+        if pd.api.types.is_integer_dtype(values.dtype):
+            values = values.astype(np.int64)
+        elif pd.api.types.is_float_dtype(values.dtype):
+            values = values.astype(np.float64)
+        columns[column] = values
+    return pd.util.hash_pandas_object(pd.DataFrame(columns), index=False).to_numpy()
+
+
+def _keys_path(source, version):
+    return os.path.join(batch_folder(source), f"keys-{version}.npy")
+
+
+# Sorted invoice key hashes of a dataset version, stored next to its batches so later ingests skip the rehash
+def _stored_keys(source, dataset):
+    target = _keys_path(source, dataset.version)
+    if os.path.exists(target):
+        return np.load(target, mmap_mode="r")
+    return np.sort(key_hashes(dataset.df))
+
+
+# Drop older versions' keys and aggregates; the manifest and batch segments are kept
+def _prune(source, version):
+    folder = batch_folder(source)
+    for name in os.listdir(folder):
+        if name.startswith(("keys-", "cube-", "daily-", "moments-")) and version not in name:
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+
+
+# Batch files in the drop folder, oldest name first (hidden files and Excel lock files are skipped)
+def batch_files(folder=config.INCOMING_DIR):
+    if not os.path.isdir(folder):
+        return []
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if name.lower().endswith(SOURCE_TYPES) and not name.startswith((".", "~$"))]
+
+
+# Changes whenever a batch file is added to or modified in the drop folder, without reading the files
+def folder_signature(folder=config.INCOMING_DIR):
+    return tuple((path, file_signature(path)) for path in batch_files(folder))
+
+
+# New files in the drop folder (not ingested before, by content hash)
+def pending_files(source=config.DATA_PATH, folder=config.INCOMING_DIR):
+    seen = {batch["hash"] for batch in read_manifest(source)["batches"]}
+    return [path for path in batch_files(folder) if file_hash(path) not in seen]
+
+
+# Append the new files of the drop folder to the stored dataset. Rows whose invoice key is already stored
+# are dropped; the cube, daily totals and column moments are updated from the new rows alone. Returns one entry per file.
+def ingest_folder(source=config.DATA_PATH, folder=config.INCOMING_DIR):
+    with _lock:
+        files = pending_files(source, folder)
+        if not files:
+            return []
+
+        dataset = load_dataset(source)
+        manifest = read_manifest(source)
+        columns = list(dataset.df.columns)
+        stored = dataset.aggregates or {}
+        cube_base = stored["cube"] if "cube" in stored else build_cube(dataset.df).base
+        daily = stored["daily"] if "daily" in stored else daily_totals(dataset.df)
+        moments = Moments.from_frame(stored["moments"]) if "moments" in stored else Moments.of_frame(dataset.df)
+        keys = _stored_keys(source, dataset)
+        version = dataset.version
+
+        # Every sheet of every new file is parsed in parallel first; rows are then appended file by file
+        parsed = read_files(files)
+        results = []
+        for path, (batch, before, stats) in zip(files, parsed):
+            start = time.perf_counter()
+            digest = file_hash(path)
+            batch, _ = apply_schema(batch, before)
+            missing = [column for column in columns if column not in batch.columns]
+            if missing:
+                raise ValueError(f"{os.path.basename(path)} is missing columns: {', '.join(missing)}")
+            batch = batch[columns]
+
+            hashes = key_hashes(batch)
+            fresh = ~np.isin(hashes, keys) & ~pd.Series(hashes).duplicated().to_numpy()
+            rows = batch[fresh].reset_index(drop=True)
+
+            entry = {"file": os.path.basename(path), "hash": digest, "segment": None, "rows": len(rows),
+                     "duplicates": int((~fresh).sum()),
+                     "ingested": datetime.datetime.now().isoformat(timespec="seconds")}
+            if len(rows):
+                entry["segment"] = f"{digest}.arrow"
+                write_snapshot(rows, os.path.join(batch_folder(source), entry["segment"]))
+                cube_base = merge_bases(cube_base, build_cube(rows).base)
+                daily = merge_daily(daily, daily_totals(rows))
+                moments = moments.merge(Moments.of_frame(rows))
+                keys = np.sort(np.concatenate([keys, hashes[fresh]]))
+
+            manifest["batches"].append(entry)
+            version = combined_version(version, [entry])
+            entry["seconds"] = round(stats["seconds"] + time.perf_counter() - start, 3)
+            entry["rows_per_second"] = round(stats["rows_per_second"])
+            results.append(entry)
+
+        # Aggregates and keys first, manifest last: readers only see the new version once it is complete
+        os.makedirs(batch_folder(source), exist_ok=True)
+        write_snapshot(cube_base, aggregate_path(source, version, "cube"))
+        write_snapshot(daily, aggregate_path(source, version, "daily"))
+        write_snapshot(moments.to_frame(), aggregate_path(source, version, "moments"))
+        np.save(_keys_path(source, version), keys)
+        write_manifest(source, manifest)
+        _prune(source, version)
+        return results
+
+
+# Forget every appended batch; the dashboard falls back to the source file alone
+def reset(source=config.DATA_PATH):
+    shutil.rmtree(batch_folder(source), ignore_errors=True)
+
+
+# python ingest.py [--source Adidas.xlsx] [--folder incoming] [--reset]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append new sales batches from a drop folder to the dataset.")
+    parser.add_argument("--source", default=config.DATA_PATH)
+    parser.add_argument("--folder", default=config.INCOMING_DIR)
+    parser.add_argument("--reset", action="store_true", help="Remove all appended batches")
+    args = parser.parse_args()
+
+    if args.reset:
+        reset(args.source)
+        print(f"Removed the batches appended to {args.source}")
+    else:
+        for entry in ingest_folder(args.source, args.folder):
+            print(f"{entry['file']}: {entry['rows']:,} rows appended, {entry['duplicates']:,} duplicates skipped "
+                  f"({entry['seconds'] * 1000:.0f} ms, parsed at {entry['rows_per_second']:,} rows/s)")
+        dataset = load_dataset(args.source)
+        print(f"{len(dataset.df):,} rows, version {dataset.version}, {len(dataset.batches)} batches")
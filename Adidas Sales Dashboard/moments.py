@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+# Rows per block of the profiling scan; bounds the float64 copy held at once
+CHUNK_ROWS = 1_000_000
+
+# Quantiles reported by statistics(), as in DataFrame.describe()
+QUANTILES = [0.25, 0.5, 0.75]
+
+
+# Mergeable summary of a frame: for the numeric columns the count, mean, sum of squared deviations (M2), min,
+# max and the co-moment matrix behind correlations; missing values of every column. Summaries of two row sets
+# merge exactly (pairwise update of Chan et al.), so appended rows never require a rescan of stored ones.
+# Co-moments are taken over the rows where every numeric column is present.
+class Moments:
+    def __init__(self, rows, columns, count, mean, m2, minimum, maximum, pairs, pair_mean, comoment, missing):
+        self.rows = rows
+        self.columns = list(columns)
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.minimum = minimum
+        self.maximum = maximum
+        self.pairs = pairs
+        self.pair_mean = pair_mean
+        self.comoment = comoment
+        # Missing values per column of the frame, numeric or not
+        self.missing = missing
+
+    # Summary of one block of rows: one float64 copy of the numeric columns, every statistic taken from it
+    @classmethod
+    def of_block(cls, df):
+        numeric = df.select_dtypes("number")
+        values = numeric.to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        count = present.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(present, values, 0).sum(axis=0) / count
+            deviations = np.where(present, values - mean, 0)
+        complete = present.all(axis=1)
+        paired = values[complete]
+        pair_mean = paired.mean(axis=0) if len(paired) else np.zeros(len(numeric.columns))
+        centered = paired - pair_mean
+        return cls(len(df), numeric.columns, count, np.nan_to_num(mean), (deviations ** 2).sum(axis=0),
+                   np.fmin.reduce(values, axis=0, initial=np.inf), np.fmax.reduce(values, axis=0, initial=-np.inf),
+                   len(paired), pair_mean, centered.T @ centered, df.isna().sum())
+
+    # Summary of a whole frame, one block at a time
+    @classmethod
+    def of_frame(cls, df, chunk_rows=CHUNK_ROWS):
+        result = cls.of_block(df.iloc[:chunk_rows])
+        for start in range(chunk_rows, len(df), chunk_rows):
+            result = result.merge(cls.of_block(df.iloc[start:start + chunk_rows]))
+        return result
+
+    # Summary of both row sets, from the two summaries alone
+    def merge(self, other):
+        if other.columns != self.columns:
+            raise ValueError(f"Cannot merge moments of columns {self.columns} and {other.columns}")
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            share = np.where(count > 0, other.count / count, 0)
+        mean = self.mean + delta * share
+        m2 = self.m2 + other.m2 + delta ** 2 * self.count * share
+
+        pairs = self.pairs + other.pairs
+        pair_delta = other.pair_mean - self.pair_mean
+        pair_share = other.pairs / pairs if pairs else 0
+        pair_mean = self.pair_mean + pair_delta * pair_share
+        comoment = self.comoment + other.comoment + np.outer(pair_delta, pair_delta) * self.pairs * pair_share
+
+        missing = self.missing.add(other.missing, fill_value=0).astype(np.int64)
+        return Moments(self.rows + other.rows, self.columns, count, mean, m2, np.fmin(self.minimum, other.minimum),
+                       np.fmax(self.maximum, other.maximum), pairs, pair_mean, comoment, missing)
+
+    # Pearson correlations between the given numeric columns
+    def correlation(self, columns):
+        positions = [self.columns.index(column) for column in columns]
+        comoment = self.comoment[np.ix_(positions, positions)]
+        scale = np.sqrt(np.diag(comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = comoment / np.outer(scale, scale)
+        np.fill_diagonal(values, np.where(scale > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(values, -1, 1), index=list(columns), columns=list(columns))
+
+    # Same layout as DataFrame.describe(); quantiles (column -> [25%, 50%, 75%]) are not mergeable and are
+    # passed in (see column_quantiles)
+    def statistics(self, quantiles):
+        count = self.count.astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(self.m2 / (count - 1))
+        empty = count == 0
+        rows = {
+            "count": count,
+            "mean": np.where(empty, np.nan, self.mean),
+            "std": np.where(count > 1, std, np.nan),
+            "min": np.where(empty, np.nan, self.minimum),
+        }
+        for position, quantile in enumerate(QUANTILES):
+            rows[f"{quantile:.0%}"] = [quantiles[column][position] for column in self.columns]
+        rows["max"] = np.where(empty, np.nan, self.maximum)
+        return pd.DataFrame(rows, index=self.columns).T
+
+    # Flat frame for the aggregate store (one row per column of the frame)
+    def to_frame(self):
+        frame = pd.DataFrame({"Column": self.missing.index.astype(str), "Missing": self.missing.to_numpy()})
+        numeric = frame["Column"].isin(self.columns).to_numpy()
+        fields = {"Count": self.count, "Mean": self.mean, "M2": self.m2, "Min": self.minimum, "Max": self.maximum,
+                  "PairMean": self.pair_mean}
+        fields.update({f"Co:{column}": self.comoment[:, i] for i, column in enumerate(self.columns)})
+        order = frame["Column"][numeric].map({column: i for i, column in enumerate(self.columns)}).to_numpy()
+        for name, values in fields.items():
+            frame[name] = np.nan
+            frame.loc[numeric, name] = np.asarray(values, dtype=np.float64)[order]
+        frame["Numeric"] = numeric
+        frame["Rows"] = self.rows
+        frame["Pairs"] = self.pairs
+        return frame
+
+    @classmethod
+    def from_frame(cls, frame):
+        numeric = frame[frame["Numeric"]]
+        columns = list(numeric["Column"])
+        missing = pd.Series(frame["Missing"].to_numpy(dtype=np.int64), index=frame["Column"].tolist())
+        comoment = numeric[[f"Co:{column}" for column in columns]].to_numpy(dtype=np.float64)
+        rows, pairs = (int(frame["Rows"].iloc[0]), int(frame["Pairs"].iloc[0])) if len(frame) else (0, 0)
+        return cls(rows, columns, numeric["Count"].to_numpy(dtype=np.int64), numeric["Mean"].to_numpy(),
+                   numeric["M2"].to_numpy(), numeric["Min"].to_numpy(), numeric["Max"].to_numpy(), pairs,
+                   numeric["PairMean"].to_numpy(), comoment, missing)
+
+
+# Quartiles of the numeric columns (linear interpolation, as in describe()); a selection per column, no sort
+def column_quantiles(df, columns):
+    result = {}
+    for column in columns:
+        values = df[column].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values)]
+        result[column] = np.quantile(values, QUANTILES) if len(values) else [np.nan] * len(QUANTILES)
+    return result
@@ -0,0 +1,121 @@
+import json
+import logging
+import threading
+import time
+
+import config
+
+# One JSON line per section per script run
+logger = logging.getLogger("sales_dashboard.perf")
+if config.PERF_LOG and not logger.handlers:
+    _handler = logging.FileHandler(config.PERF_LOG)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Per-section totals across every run served by this process
+_totals = {}
+_totals_lock = threading.Lock()
+
+
+class SectionRecord:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.wall_ms = None
+        self.rows = 0
+        self.payload_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def cache(self):
+        if not self.cache_hits and not self.cache_misses:
+            return None
+        if not self.cache_misses:
+            return "hit"
+        return "miss" if not self.cache_hits else "partial"
+
+    def as_dict(self):
+        return {
+            "section": self.name,
+            "wall_ms": round(self.wall_ms, 3) if self.wall_ms is not None else None,
+            "rows": self.rows,
+            "payload_bytes": self.payload_bytes,
+            "cache": self.cache,
+        }
+
+
+# Timings of one script run; each section is bracketed by start() / end(). A section rerun on its own
+# (a Streamlit fragment) replaces its earlier record.
+class RunProfile:
+    def __init__(self, session=None):
+        self.session = session
+        self.records = []
+        self.current = None
+        # Chart tasks of the last chart run (scheduler.SectionTasks)
+        self.tasks = None
+
+    def start(self, name):
+        if self.current is not None:
+            self.end()
+        self.current = SectionRecord(name)
+        self.records = [record for record in self.records if record.name != name]
+        self.records.append(self.current)
+        return self.current
+
+    def end(self):
+        record = self.current
+        if record is None:
+            return None
+        self.current = None
+        record.wall_ms = (time.perf_counter() - record.started) * 1000
+        _add_to_totals(record)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(dict(record.as_dict(), session=self.session, time=time.time())))
+        return record
+
+    def add_rows(self, rows):
+        if self.current is not None:
+            self.current.rows += int(rows)
+
+    def add_payload(self, nbytes):
+        if self.current is not None:
+            self.current.payload_bytes += int(nbytes)
+
+    def cache_result(self, hit):
+        if self.current is not None:
+            if hit:
+                self.current.cache_hits += 1
+            else:
+                self.current.cache_misses += 1
+
+    def table(self):
+        return [record.as_dict() for record in self.records]
+
+
+def _add_to_totals(record):
+    with _totals_lock:
+        totals = _totals.setdefault(record.name, {"runs": 0, "total_ms": 0.0, "max_ms": 0.0, "payload_bytes": 0})
+        totals["runs"] += 1
+        totals["total_ms"] += record.wall_ms
+        totals["max_ms"] = max(totals["max_ms"], record.wall_ms)
+        totals["payload_bytes"] += record.payload_bytes
+
+
+# Sections ordered by total time spent in this process, most expensive first
+def process_summary():
+    with _totals_lock:
+        rows = [dict(section=name, mean_ms=totals["total_ms"] / totals["runs"], **totals)
+                for name, totals in _totals.items()]
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+
+# Serialized size of a figure as sent to the browser, measured once per figure object
+def figure_bytes(fig):
+    size = getattr(fig, "_payload_bytes", None)
+    if size is None:
+        size = len(fig.to_json().encode("utf-8"))
+        fig._payload_bytes = size
+    return size
@@ -0,0 +1,43 @@
+import io
+import os
+
+from cache import shared_cache
+from startup import lazy_import
+
+# Size of the rendered word cloud, in pixels
+WORD_CLOUD_SIZE = (800, 400)
+
+
+# Contents of a static file (e.g. the logo), read again only when the file changes
+def file_bytes(path):
+    stat = os.stat(path)
+
+    def read():
+        with open(path, "rb") as f:
+            return f.read()
+
+    return shared_cache.get_or_build(("file", os.path.abspath(path), stat.st_mtime_ns, stat.st_size), read)
+
+
+# Word cloud of a frequency Series as PNG bytes. Drawn on its own matplotlib Figure (no pyplot global state),
+# so sessions can render concurrently. wordcloud and matplotlib are imported on first use.
+def word_cloud_png(frequencies, title=None):
+    WordCloud = lazy_import("wordcloud").WordCloud
+    Figure = lazy_import("matplotlib.figure").Figure
+    width, height = WORD_CLOUD_SIZE
+    cloud = WordCloud(width=width, height=height, random_state=21, max_font_size=110)
+    cloud.generate_from_frequencies(frequencies)
+    if title is None:
+        buffer = io.BytesIO()
+        cloud.to_image().save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.imshow(cloud, interpolation="bilinear")
+    ax.axis("off")
+    ax.set_title(title)
+    buffer = io.BytesIO()
+    # Same resolution and trimming as st.pyplot
+    fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+    return buffer.getvalue()
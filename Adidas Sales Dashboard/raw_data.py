@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from cache import shared_cache
+
+# Rows per page offered by the raw data viewer
+PAGE_SIZES = [25, 50, 100, 500]
+
+
+# Row positions of df ordered by a column, as sort_data orders them (missing values last); the sort is stable
+# so pages do not shift between reruns
+def sort_positions(df, column, order="Ascending"):
+    values = df[column].reset_index(drop=True)
+    return values.sort_values(ascending=(order == "Ascending"), kind="stable").index.to_numpy()
+
+
+# Rows matching a column filter: a case-insensitive substring for text and dates, an inclusive (low, high)
+# range for numbers. Categorical columns are matched on their categories, not row by row.
+def match_mask(df, column, query):
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        hits = values.cat.categories.astype(str).str.contains(query, case=False, regex=False)
+        return np.isin(values.cat.codes.to_numpy(), np.flatnonzero(hits))
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        low, high = query
+        return ((values >= low) & (values <= high)).to_numpy()
+    return values.astype(str).str.contains(query, case=False, regex=False).to_numpy()
+
+
+# (min, max) of a numeric column, filtered by range; None for columns filtered by text
+def value_range(df, column):
+    values = df[column]
+    if not pd.api.types.is_numeric_dtype(values.dtype) or not values.notna().any():
+        return None
+    return float(values.min()), float(values.max())
+
+
+# Positions of the rows shown by the viewer, in display order. key identifies the frame (dataset version and
+# sidebar filters); the sort order and the filtered positions are cached separately, so changing the column
+# filter does not sort again.
+def view_positions(df, key, sort_column=None, order="Ascending", filter_column=None, query=None):
+    key = tuple(key)
+    dtype = np.int32 if len(df) < 2 ** 31 else np.int64
+
+    def ordered():
+        if sort_column is None:
+            return np.arange(len(df), dtype=dtype)
+        return sort_positions(df, sort_column, order).astype(dtype)
+
+    positions = shared_cache.get_or_build(("raw_order",) + key + (sort_column, order), ordered)
+    if filter_column is None or query is None or query == "":
+        return positions
+
+    def filtered():
+        return positions[match_mask(df, filter_column, query)[positions]]
+
+    return shared_cache.get_or_build(("raw_view",) + key + (sort_column, order, filter_column, query), filtered)
+
+
+# Number of pages of a view
+def page_count(positions, size):
+    return max(1, -(-len(positions) // size))
+
+
+# One page of a view (page numbers start at 1): only these rows are sent to the browser
+def page_rows(df, positions, page, size):
+    start = (page - 1) * size
+    return df.iloc[positions[start:start + size]]
@@ -0,0 +1,131 @@
+import datetime
+import logging
+import threading
+import time
+
+import config
+from backends import get_backend
+from data_loader import dataset_signature, load_dataset, reuse_dataset
+from filters import get_filter_index
+from ingest import folder_signature, ingest_folder
+
+logger = logging.getLogger("sales_dashboard.refresher")
+
+_refreshers = {}
+_lock = threading.Lock()
+
+
+# Serves the current dataset and refreshes it in a background thread (stale-while-revalidate): when the
+# source file changes or new batches arrive in the drop folder, the new version is loaded and its snapshot,
+# query backend, filter index and daily totals are built off the request path, then swapped in at once.
+# Sessions keep getting the previous version until the new one is ready.
+class DataRefresher:
+    def __init__(self, path, folder=config.INCOMING_DIR, backend=config.BACKEND, interval=config.REFRESH_SECONDS):
+        self.path = path
+        self.folder = folder
+        self.backend = backend
+        self.interval = interval
+        self.dataset = None
+        # Last background failures (the previous version keeps being served), each cleared by its own next
+        # success, and time of the last swap
+        self.load_error = None
+        self.ingest_error = None
+        self.refreshed = None
+        self._signature = None
+        self._folder_signature = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # Failure reported to sessions: the source reload's, else the batch ingest's
+    @property
+    def error(self):
+        return self.load_error if self.load_error is not None else self.ingest_error
+
+    # Dataset served to this run; only the very first call in a process loads synchronously. Later runs get
+    # the swapped-in version as an in-memory load, timed for this call.
+    def current(self):
+        start = time.perf_counter()
+        loaded = None
+        if self.dataset is None:
+            with self._lock:
+                if self.dataset is None:
+                    signature = dataset_signature(self.path)
+                    self.dataset = self._prepare()
+                    self._signature = signature
+                    self.refreshed = datetime.datetime.now()
+                    loaded = self.dataset
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="sales-data-refresher", daemon=True)
+                    self._thread.start()
+        if loaded is not None:
+            return loaded
+        return reuse_dataset(self.dataset, start)
+
+    # Load a version and build everything the first rerun on it would otherwise wait for
+    def _prepare(self):
+        dataset = load_dataset(self.path)
+        backend = get_backend(dataset, self.backend)
+        get_filter_index(dataset)
+        backend.time_series()
+        return dataset
+
+    def check(self):
+        signature = folder_signature(self.folder)
+        if signature != self._folder_signature:
+            self._folder_signature = signature
+            # A failed batch is reported until the drop folder changes again and ingests cleanly
+            try:
+                ingest_folder(self.path, self.folder)
+            except Exception as e:
+                self.ingest_error = e
+                logger.exception("Ingesting the drop folder failed; still serving version %s", self.dataset.version)
+            else:
+                self.ingest_error = None
+
+        signature = dataset_signature(self.path)
+        if signature != self._signature:
+            start = time.perf_counter()
+            try:
+                dataset = self._prepare()
+            except Exception as e:
+                # e.g. a half-copied file; retried on the next check
+                self.load_error = e
+                raise
+            self.dataset = dataset
+            self._signature = signature
+            self.refreshed = datetime.datetime.now()
+            self.load_error = None
+            logger.info("Swapped in dataset version %s (%d rows) after %.1f s", dataset.version, len(dataset.df),
+                        time.perf_counter() - start)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Background data refresh failed; still serving version %s", self.dataset.version)
+
+
+# Refresher for a data file, shared by every session of this process
+def get_refresher(path=config.DATA_PATH):
+    refresher = _refreshers.get(path)
+    if refresher is None:
+        with _lock:
+            refresher = _refreshers.setdefault(path, DataRefresher(path))
+    return refresher
+
+
+# Last background refresh failure for a data file, if any
+def refresh_error(path=config.DATA_PATH):
+    refresher = _refreshers.get(path)
+    return refresher.error if refresher is not None else None
+
+
+# Current dataset for a data file; with REFRESH_SECONDS = 0 the file is checked on every rerun instead
+def current_dataset(path=config.DATA_PATH):
+    if config.REFRESH_SECONDS <= 0:
+        return load_dataset(path)
+    return get_refresher(path).current()
@@ -0,0 +1,164 @@
+import argparse
+import base64
+import datetime
+import html
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import config
+from backends import get_backend
+from charts import BUILDERS, chart_specs, sort_data
+from data_loader import load_dataset
+from rasters import word_cloud_png
+from timeseries import GRANULARITIES
+
+REPORT_FORMATS = ["html", "png"]
+
+
+# Tables without a chart, in page order: title -> frame
+def report_tables(backend, sort_order="Ascending", granularity="Monthly"):
+    return {
+        f"Highlight Table of Total Sales ({granularity}, vs. prior year)":
+            sort_data(backend.time_series().yoy(granularity), "TotalSales", sort_order),
+        "Basic Statistics": backend.statistics(),
+    }
+
+
+# Worker: build one figure and serialize it (an HTML fragment, or a PNG file through kaleido)
+def render_chart(task):
+    name, data, fmt, folder = task
+    fig = BUILDERS[name](data)
+    if fmt == "png":
+        output = os.path.join(folder, f"{name}.png")
+        fig.write_image(output, width=1200, height=fig.layout.height or 600)
+    else:
+        output = fig.to_html(full_html=False, include_plotlyjs=False, div_id=name)
+    return name, output
+
+
+# Word cloud of products as PNG bytes, or None when wordcloud is not installed
+def word_cloud(backend):
+    try:
+        return word_cloud_png(backend.product_sales().set_index("Product")["Frequency"])
+    except ImportError:
+        return None
+
+
+def _table_html(frame):
+    return frame.to_html(float_format=lambda value: f"{value:,.2f}", border=0, classes="data")
+
+
+def _page(title, subtitle, sections):
+    body = "\n".join(sections)
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<script src="plotly.min.js"></script>
+<style>
+    body {{ font-family: sans-serif; margin: 2rem auto; max-width: 1200px; }}
+    h1 {{ text-align: center; font-size: 26px; }}
+    table.data {{ border-collapse: collapse; font-size: 13px; }}
+    table.data td, table.data th {{ padding: 2px 8px; text-align: right; }}
+    section {{ border-bottom: 1px solid #ddd; padding: 1rem 0; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+<p>{html.escape(subtitle)}</p>
+{body}
+</body>
+</html>
+"""
+
+
+# Render the whole dashboard without a Streamlit server; figures are built in a pool of worker processes
+def render_report(data_path=config.DATA_PATH, folder="report", fmt="html", workers=None, sort_order="Ascending",
+                  granularity="Monthly"):
+    if fmt == "png":
+        try:
+            import kaleido  # noqa: F401
+        except ImportError as e:
+            raise ImportError("PNG output requires the kaleido package (pip install kaleido).") from e
+    os.makedirs(folder, exist_ok=True)
+    timings = {}
+
+    start = time.perf_counter()
+    dataset = load_dataset(data_path)
+    backend = get_backend(dataset, config.BACKEND)
+    timings["load"] = time.perf_counter() - start
+
+    # Aggregates are small and come from cached rollups, so they are computed here and shipped to the workers
+    start = time.perf_counter()
+    specs = chart_specs(backend, sort_order, granularity)
+    data = {name: aggregate() for name, (_, aggregate, _) in specs.items()}
+    tables = report_tables(backend, sort_order, granularity)
+    timings["aggregate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rendered = dict(pool.map(render_chart, [(name, data[name], fmt, folder) for name in specs]))
+    timings["figures"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cloud = word_cloud(backend)
+    if fmt == "png":
+        for name, (_, _, table) in specs.items():
+            frame = table(data[name]) if table else data[name]
+            if isinstance(frame, pd.DataFrame):
+                frame.to_csv(os.path.join(folder, f"{name}.csv"), index=not isinstance(frame.index, pd.RangeIndex))
+        for title, frame in tables.items():
+            frame.to_csv(os.path.join(folder, f"{title.split(' (')[0].replace(' ', '_')}.csv"))
+        if cloud is not None:
+            with open(os.path.join(folder, "word_cloud.png"), "wb") as f:
+                f.write(cloud)
+        output = folder
+    else:
+        from plotly.offline import get_plotlyjs
+        with open(os.path.join(folder, "plotly.min.js"), "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+        sections = []
+        for name, (title, _, table) in specs.items():
+            frame = table(data[name]) if table else data[name]
+            details = (f"<details><summary>View data</summary>{_table_html(frame)}</details>"
+                       if isinstance(frame, pd.DataFrame) else "")
+            sections.append(f"<section><h2>{html.escape(title)}</h2>{rendered[name]}{details}</section>")
+        if cloud is not None:
+            sections.append(f'<section><h2>Word Cloud of Products</h2><img alt="Word cloud" '
+                            f'src="data:image/png;base64,{base64.b64encode(cloud).decode()}"></section>')
+        for title, frame in tables.items():
+            sections.append(f"<section><h2>{html.escape(title)}</h2>{_table_html(frame)}</section>")
+        modified = dataset.modified.strftime("%d %B %Y %H:%M") if dataset.modified else "unknown"
+        subtitle = (f"{len(dataset.df):,} rows, data last updated {modified}, report generated "
+                    f"{datetime.datetime.now():%d %B %Y %H:%M}")
+        output = os.path.join(folder, "index.html")
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(_page("Adidas Interactive Sales Dashboard", subtitle, sections))
+    timings["write"] = time.perf_counter() - start
+    return output, timings
+
+
+# python report.py [--data Adidas.xlsx] [--output report] [--format html|png] [--workers N]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the sales dashboard to a static report.")
+    parser.add_argument("--data", default=config.DATA_PATH)
+    parser.add_argument("--output", default="report", help="Output folder")
+    parser.add_argument("--format", choices=REPORT_FORMATS, default="html")
+    parser.add_argument("--workers", type=int, default=None, help="Figure worker processes (default: one per core)")
+    parser.add_argument("--sort", choices=["Ascending", "Descending"], default="Ascending")
+    parser.add_argument("--granularity", choices=list(GRANULARITIES), default="Monthly")
+    args = parser.parse_args()
+
+    try:
+        output, timings = render_report(args.data, args.output, args.format, args.workers, args.sort,
+                                        args.granularity)
+    except (ImportError, FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Report written to {output}")
+    print("  ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in timings.items()))
@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Process-wide pool shared by every session. Threads rather than processes: tasks read the loaded data, the
+# query backends and the shared cache in place, and numpy, pandas, Arrow and DuckDB release the GIL while they
+# aggregate. None when SECTION_WORKERS is 1.
+def get_pool(workers=config.SECTION_WORKERS):
+    global _pool
+    if workers == 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1, thread_name_prefix="section")
+        return _pool
+
+
+class TaskTiming:
+    def __init__(self, name, origin):
+        self.name = name
+        self.origin = origin
+        self.started = None
+        self.finished = None
+        # Time the page waited for the task once it reached the section
+        self.wait_ms = None
+
+    def as_dict(self):
+        def ms(moment):
+            return round((moment - self.origin) * 1000, 3) if moment is not None else None
+
+        return {
+            "task": self.name,
+            "start_ms": ms(self.started),
+            "end_ms": ms(self.finished),
+            "build_ms": round((self.finished - self.started) * 1000, 3) if self.finished is not None else None,
+            "wait_ms": round(self.wait_ms, 3) if self.wait_ms is not None else None,
+        }
+
+
+# Independent tasks of one script run: all submitted up front, then collected in page order, so each section
+# is written as soon as its own task is done while later ones are still being built. Without a pool, a task
+# runs when its section collects it. Tasks must not call Streamlit or the run's RunProfile (they are not
+# thread-safe); they return what the section records.
+class SectionTasks:
+    def __init__(self, pool=None):
+        self.pool = pool
+        self.started = time.perf_counter()
+        self._tasks = {}
+        self._timings = {}
+
+    def submit(self, name, build):
+        timing = self._timings[name] = TaskTiming(name, self.started)
+
+        def run():
+            timing.started = time.perf_counter()
+            try:
+                return build()
+            finally:
+                timing.finished = time.perf_counter()
+
+        self._tasks[name] = self.pool.submit(run) if self.pool is not None else run
+
+    # Result of a task, waiting for it if needed; a task's exception is raised here, in its section
+    def result(self, name):
+        task = self._tasks[name]
+        start = time.perf_counter()
+        try:
+            return task() if callable(task) else task.result()
+        finally:
+            self._timings[name].wait_ms = (time.perf_counter() - start) * 1000
+
+    def timings(self):
+        return [timing.as_dict() for timing in self._timings.values()]
+
+    # Total build time of the finished tasks against the time until the last one finished
+    def summary(self):
+        finished = [timing for timing in self._timings.values() if timing.finished is not None]
+        if not finished:
+            return None
+        build_ms = sum(timing.finished - timing.started for timing in finished) * 1000
+        elapsed_ms = (max(timing.finished for timing in finished) - self.started) * 1000
+        return {"tasks": len(finished), "build_ms": build_ms, "elapsed_ms": elapsed_ms,
+                "speedup": build_ms / elapsed_ms if elapsed_ms else 1.0}
@@ -0,0 +1,34 @@
+# Inputs a dashboard output can depend on:
+#   dataset    - version of the loaded data file
+#   filters    - sidebar filter selection (filters.filters_key)
+#   sort_order - the "Sort Data" radio
+#   granularity - the time granularity of the sales-over-time charts
+#   sankey_levels - the dimensions the Sankey diagram flows through
+INPUTS = ("dataset", "filters", "sort_order", "granularity", "sankey_levels")
+
+# Dependency map: each cached output and the inputs it is built from. An output is only rebuilt when one of
+# its own inputs changes; otherwise the previous one is reused (e.g. the correlation heatmap on a sort change).
+DEPENDENCIES = {
+    "retailer_bar": ("dataset", "filters", "sort_order"),
+    "monthly_line": ("dataset", "filters", "granularity"),
+    "state_combo": ("dataset", "filters", "sort_order"),
+    "region_city_treemap": ("dataset", "filters", "sort_order"),
+    "city_pie": ("dataset", "filters", "sort_order"),
+    "product_donut": ("dataset", "filters", "sort_order"),
+    "correlation_heatmap": ("dataset", "filters"),
+    "density_heatmap": ("dataset", "filters"),
+    "product_profit_bar": ("dataset", "filters", "sort_order"),
+    "retailer_box": ("dataset", "filters", "sort_order"),
+    "product_region_bubble": ("dataset", "filters", "sort_order"),
+    "monthly_area": ("dataset", "filters", "granularity"),
+    "word_cloud": ("dataset", "filters"),
+    "sankey_flows": ("dataset", "filters", "sankey_levels"),
+    "sankey": ("dataset", "filters", "sankey_levels"),
+    "data_profile": ("dataset", "filters"),
+}
+
+
+# Cache key of an output: its name and the current values of just the inputs it depends on
+def output_key(name, values):
+    return ("output", name) + tuple(values[input_name] for input_name in DEPENDENCIES[name])
+
@@ -0,0 +1,69 @@
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+# Start of the first script run in this process (the module stays imported across reruns)
+APP_START = time.perf_counter()
+
+# Milestone name -> seconds since APP_START, first occurrence only
+_marks = {}
+# Module name -> seconds spent importing it on first use
+_imports = {}
+
+# Heavy dependencies reported by `python startup.py`
+PROFILED_MODULES = ["streamlit", "pandas", "pyarrow", "plotly.express", "matplotlib.pyplot", "wordcloud", "duckdb"]
+
+
+def mark(name):
+    if name not in _marks:
+        _marks[name] = time.perf_counter() - APP_START
+
+
+# Import a heavy optional dependency only when the section that needs it renders
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _imports.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+def startup_report():
+    return {
+        "marks_ms": {name: seconds * 1000 for name, seconds in _marks.items()},
+        "lazy_imports_ms": {name: seconds * 1000 for name, seconds in _imports.items()},
+    }
+
+
+# Cold import time of one module in a fresh interpreter, from python -X importtime (microseconds, cumulative)
+def cold_import_ms(name):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {name}"],
+                            capture_output=True, text=True)
+    for line in reversed(result.stderr.splitlines()):
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == name:
+            return int(parts[1]) / 1000
+    return None
+
+
+# Print cold import costs and time-to-first-chart of a headless run: python startup.py
+if __name__ == "__main__":
+    print(f"{'module':<20}{'cold import ms':>16}")
+    for name in PROFILED_MODULES:
+        ms = cold_import_ms(name)
+        print(f"{name:<20}{ms:16.1f}" if ms is not None else f"{name:<20}{'not installed':>16}")
+
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), default_timeout=600)
+    app.run()
+    report = sys.modules["startup"].startup_report()
+    print()
+    for name, ms in report["marks_ms"].items():
+        print(f"{name:<20}{ms:16.1f} ms after script start")
+    for name, ms in report["lazy_imports_ms"].items():
+        print(f"lazy {name:<15}{ms:16.1f} ms")
@@ -0,0 +1,120 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Same columns, dtypes and cardinalities as Adidas.xlsx (6 retailers, 5 regions, 50 states, ~52 cities,
+# 6 products, 3 sales methods, two years of invoice dates)
+RETAILERS = {"Foot Locker": 1185732, "Walmart": 1128299, "Sports Direct": 1197831,
+             "West Gear": 1128299, "Kohl's": 1189833, "Amazon": 1185732}
+PRODUCTS = ["Men's Street Footwear", "Men's Athletic Footwear", "Women's Street Footwear",
+            "Women's Athletic Footwear", "Men's Apparel", "Women's Apparel"]
+SALES_METHODS = ["In-store", "Outlet", "Online"]
+REGIONS = {
+    "Northeast": ["New York", "Pennsylvania", "New Jersey", "Massachusetts", "Connecticut", "Rhode Island",
+                  "New Hampshire", "Vermont", "Maine", "Delaware", "Maryland"],
+    "South": ["Texas", "Oklahoma", "Arkansas", "Louisiana", "Mississippi", "Alabama", "Tennessee", "Kentucky",
+              "New Mexico"],
+    "West": ["California", "Washington", "Oregon", "Nevada", "Arizona", "Utah", "Colorado", "Idaho",
+             "Montana", "Wyoming", "Alaska", "Hawaii"],
+    "Midwest": ["Illinois", "Ohio", "Michigan", "Indiana", "Wisconsin", "Minnesota", "Iowa", "Missouri",
+                "Kansas", "Nebraska", "North Dakota", "South Dakota"],
+    "Southeast": ["Florida", "Georgia", "South Carolina", "North Carolina", "Virginia", "West Virginia"],
+}
+# States with a second store city, as in the sample workbook
+SECOND_CITIES = {"Florida": "Orlando", "Texas": "Houston"}
+
+START_DATE = np.datetime64("2020-01-01")
+DAYS = 730
+
+
+# State, region and city lists; extra_cities adds more store cities per state for high-cardinality runs
+def geography(extra_cities=0):
+    rows = []
+    for region, states in REGIONS.items():
+        for state in states:
+            rows.append((region, state, state if state not in SECOND_CITIES else f"{state} City"))
+            if state in SECOND_CITIES:
+                rows.append((region, state, SECOND_CITIES[state]))
+            for i in range(extra_cities):
+                rows.append((region, state, f"{state} Store {i + 1}"))
+    return pd.DataFrame(rows, columns=["Region", "State", "City"])
+
+
+def generate_chunk(rows, rng, places):
+    retailer_names = list(RETAILERS)
+    retailer = rng.integers(0, len(retailer_names), rows)
+    place = rng.integers(0, len(places), rows)
+    price = np.round(rng.uniform(7, 110, rows) * 4) / 4
+    units = np.round(rng.gamma(2.0, 120.0, rows)).clip(0, 1275).astype(np.int64)
+    margin = np.round(rng.uniform(0.1, 0.8, rows), 2)
+    total = price * units
+    dates = START_DATE + rng.integers(0, DAYS, rows).astype("timedelta64[D]")
+
+    def categorical(codes, categories):
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+    return pd.DataFrame({
+        "Retailer": categorical(retailer, retailer_names),
+        "RetailerID": np.array([RETAILERS[name] for name in retailer_names], dtype=np.int64)[retailer],
+        "InvoiceDate": dates.astype("datetime64[ns]"),
+        "Region": categorical(places["region_code"].to_numpy()[place], places["Region"].cat.categories),
+        "State": categorical(places["state_code"].to_numpy()[place], places["State"].cat.categories),
+        "City": categorical(place, places["City"].tolist()),
+        "Product": categorical(rng.integers(0, len(PRODUCTS), rows), PRODUCTS),
+        "PriceperUnit": price,
+        "UnitsSold": units,
+        "TotalSales": total,
+        "OperatingProfit": np.round(total * margin, 2),
+        "OperatingMargin": margin,
+        "SalesMethod": categorical(rng.integers(0, len(SALES_METHODS), rows), SALES_METHODS),
+    })
+
+
+# Write a synthetic dataset chunk by chunk (memory stays bounded at 10M rows); returns the path
+def generate(rows, path, seed=0, extra_cities=0, chunk_rows=1_000_000):
+    rng = np.random.default_rng(seed)
+    places = geography(extra_cities)
+    places["Region"] = places["Region"].astype("category")
+    places["State"] = places["State"].astype("category")
+    places["region_code"] = places["Region"].cat.codes
+    places["state_code"] = places["State"].cat.codes
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith(".parquet"):
+        writer = None
+        try:
+            for start in range(0, rows, chunk_rows):
+                table = pa.Table.from_pandas(generate_chunk(min(chunk_rows, rows - start), rng, places),
+                                             preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif path.endswith(".csv"):
+        for start in range(0, rows, chunk_rows):
+            generate_chunk(min(chunk_rows, rows - start), rng, places).to_csv(
+                path, mode="w" if start == 0 else "a", header=(start == 0), index=False)
+    elif path.endswith(".xlsx"):
+        # Excel only suits small samples: the whole frame is written at once
+        generate_chunk(rows, rng, places).to_excel(path, index=False)
+    else:
+        raise ValueError(f"Unsupported output type: {path}")
+    return path
+
+
+# python synthetic_data.py 1000000 sales-1m.parquet
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic sales data with the Adidas.xlsx schema.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("path", help="Output file (.parquet, .csv or .xlsx)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--extra-cities", type=int, default=0, help="Additional store cities per state")
+    args = parser.parse_args()
+    generate(args.rows, args.path, seed=args.seed, extra_cities=args.extra_cities)
+    print(f"Wrote {args.rows:,} rows to {args.path}")
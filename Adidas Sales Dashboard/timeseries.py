@@ -0,0 +1,98 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cube import MEASURES, measure_frame
+
+# Granularity -> pandas period frequency (weeks run Monday to Sunday)
+GRANULARITIES = {"Daily": "D", "Weekly": "W", "Monthly": "M", "Quarterly": "Q"}
+
+# Axis labels of each period (weeks are labelled by their Monday); display only, ordering follows the period index
+LABEL_FORMATS = {"Daily": "%d %b'%y", "Weekly": "Wk %d %b'%y", "Monthly": "%b'%y", "Quarterly": "Q%q'%y"}
+
+# Periods averaged by rolling()
+ROLLING_WINDOWS = {"Daily": 7, "Weekly": 4, "Monthly": 3, "Quarterly": 2}
+
+# Periods in a year, compared by yoy(); days use the calendar date one year earlier instead
+PERIODS_PER_YEAR = {"Weekly": 52, "Monthly": 12, "Quarterly": 4}
+
+
+# Day bucket of each invoice date (midnight)
+def day_key(dates):
+    return pd.Series(dates.values.astype("datetime64[D]").astype("datetime64[ns]"), index=dates.index, name="Day")
+
+
+# Display label of each period
+def period_labels(periods, granularity):
+    fmt = LABEL_FORMATS[granularity]
+    # %q (quarter) only exists for periods; other formats are applied to the period start date
+    return periods.strftime(fmt) if "%q" in fmt else periods.start_time.strftime(fmt)
+
+
+# One scan over the raw rows: Day, TotalSales, UnitsSold, OperatingProfit, Rows, in date order
+def daily_totals(df):
+    return (measure_frame(df).groupby(day_key(df["InvoiceDate"]))
+              .agg(TotalSales=("TotalSales", "sum"),
+                   UnitsSold=("UnitsSold", "sum"),
+                   OperatingProfit=("OperatingProfit", "sum"),
+                   Rows=("TotalSales", "size"))
+              .reset_index())
+
+
+# Daily totals of stored rows plus an appended batch, without rescanning the stored rows
+def merge_daily(left, right):
+    return pd.concat([left, right], ignore_index=True).groupby("Day", sort=True).sum().reset_index()
+
+
+# Sales over time at any granularity, resampled from daily totals so the raw rows are never scanned again
+class TimeSeries:
+    def __init__(self, daily):
+        self.daily = daily.set_index("Day")[MEASURES + ["Rows"]]
+        self._periods = {}
+        self._lock = threading.Lock()
+
+    # Per-period totals, one row per period between the first and last sale (empty periods are zero)
+    def _period_totals(self, granularity):
+        totals = self._periods.get(granularity)
+        if totals is not None:
+            return totals
+        freq = GRANULARITIES[granularity]
+        totals = self.daily.groupby(self.daily.index.to_period(freq)).sum()
+        if len(totals):
+            totals = totals.reindex(pd.period_range(totals.index[0], totals.index[-1], freq=freq), fill_value=0)
+        with self._lock:
+            self._periods[granularity] = totals
+        return totals
+
+    # Period, Start, TotalSales, UnitsSold, OperatingProfit, Rows, in date order
+    def resample(self, granularity):
+        totals = self._period_totals(granularity)
+        result = totals.reset_index(drop=True)
+        result.insert(0, "Start", totals.index.start_time)
+        result.insert(0, "Period", period_labels(totals.index, granularity))
+        return result
+
+    # Rolling mean of a measure over the last few periods, aligned with resample()
+    def rolling(self, granularity, column="TotalSales", window=None):
+        window = window or ROLLING_WINDOWS[granularity]
+        values = self._period_totals(granularity)[column].rolling(window, min_periods=1).mean()
+        return pd.Series(values.to_numpy(), name=f"{window}-period rolling mean")
+
+    # Period, measure, Prior Year (same period one year earlier), YoY % change, in date order
+    def yoy(self, granularity, column="TotalSales"):
+        totals = self._period_totals(granularity)[column]
+        if granularity in PERIODS_PER_YEAR:
+            prior_periods = totals.index - PERIODS_PER_YEAR[granularity]
+        else:
+            prior_periods = (totals.index.start_time - pd.DateOffset(years=1)).to_period(GRANULARITIES[granularity])
+        prior = totals.reindex(prior_periods).to_numpy(dtype=np.float64)
+        current = totals.to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.where(prior > 0, (current - prior) / prior * 100, np.nan)
+        return pd.DataFrame({
+            "Period": period_labels(totals.index, granularity),
+            column: totals.to_numpy(),
+            "Prior Year": prior,
+            "YoY %": change,
+        })
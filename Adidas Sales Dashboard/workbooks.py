@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+
+import config
+from data_loader import CATEGORY_COLUMNS, DATE_COLUMNS, read_source
+
+# Rows parsed into one DataFrame at a time; bounds the memory of Python objects held by a reader
+CHUNK_ROWS = 50_000
+
+WORKBOOK_TYPES = (".xlsx", ".xlsm")
+
+
+# Sheets of a workbook holding sales rows: the first sheet and every other sheet with the same header row
+# (e.g. one sheet per region); sheets with other layouts (notes, pivots) are skipped
+def data_sheets(path):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        headers = {name: _header(next(workbook[name].iter_rows(max_row=1, values_only=True), ()))
+                   for name in workbook.sheetnames}
+    finally:
+        workbook.close()
+    first = headers[workbook.sheetnames[0]]
+    return [name for name, header in headers.items() if header and header == first]
+
+
+def _header(row):
+    header = list(row)
+    while header and header[-1] is None:
+        header.pop()
+    return header if all(isinstance(name, str) for name in header) else []
+
+
+# Rows of one sheet in chunks of DataFrames, streamed through openpyxl's read-only mode
+def _sheet_chunks(path, sheet, chunk_rows):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet].iter_rows(values_only=True)
+        header = _header(next(rows, ()))
+        width = len(header)
+        chunk, chunks = [], 0
+        for row in rows:
+            row = row[:width]
+            if all(value is None for value in row):
+                continue
+            chunk.append(row)
+            if len(chunk) == chunk_rows:
+                yield pd.DataFrame.from_records(chunk, columns=header)
+                chunk, chunks = [], chunks + 1
+        # An empty sheet still yields its columns
+        if chunk or not chunks:
+            yield pd.DataFrame.from_records(chunk, columns=header)
+    finally:
+        workbook.close()
+
+
+def _chunks(path, sheet, chunk_rows):
+    if path.lower().endswith(WORKBOOK_TYPES):
+        return _sheet_chunks(path, sheet, chunk_rows)
+    if path.lower().endswith(".csv"):
+        return pd.read_csv(path, parse_dates=DATE_COLUMNS, chunksize=chunk_rows)
+    # Other types (legacy .xls, Parquet) are read whole
+    return [read_source(path)]
+
+
+# Worker: parse one sheet (or file) chunk by chunk, writing each chunk as a dictionary-encoded Arrow IPC file
+# under spool, so only one chunk of Python objects is alive at a time and no rows go back through the pipe.
+# Returns the chunk files, the memory the untyped chunks took (for the typed-schema report) and the rows parsed.
+def read_part(task):
+    path, sheet, chunk_rows, spool = task
+    start = time.perf_counter()
+    files, usage, dtypes, rows = [], None, None, 0
+    for number, chunk in enumerate(_chunks(path, sheet, chunk_rows)):
+        chunk_usage = chunk.memory_usage(deep=True, index=False)
+        usage = chunk_usage if usage is None else usage.add(chunk_usage, fill_value=0)
+        dtypes = dtypes if dtypes is not None else chunk.dtypes.astype(str)
+        for column in chunk.columns:
+            if column in CATEGORY_COLUMNS:
+                chunk[column] = chunk[column].astype("category")
+            elif column in DATE_COLUMNS:
+                chunk[column] = pd.to_datetime(chunk[column])
+        # One file per chunk: chunks can differ in dictionaries and inferred types, unified when read back
+        output = f"{spool}-{number}.arrow"
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        with pa.OSFile(output, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        files.append(output)
+        rows += len(chunk)
+    return files, usage, dtypes, rows, time.perf_counter() - start
+
+
+# Chunk files of read_part, memory-mapped: the parsed rows are paged in from disk, not held on the heap
+def _read_chunks(files):
+    return [pa.ipc.open_file(pa.memory_map(file)).read_all() for file in files]
+
+
+# Read sales files (workbooks with all their data sheets, CSV, legacy .xls or Parquet). Every sheet and file
+# is parsed in parallel in a process pool; the chunks are spooled to temporary Arrow files and memory-mapped,
+# so the only full in-memory copy of the rows is the returned frame. Returns, per path, the rows as a frame
+# (category columns already categorical), the untyped column sizes for the memory report (see
+# data_loader.apply_schema) and read statistics (sheets, rows, parse seconds, rows per second).
+def read_files(paths, workers=config.INGEST_WORKERS, chunk_rows=CHUNK_ROWS):
+    with tempfile.TemporaryDirectory(prefix="sales-read-", ignore_cleanup_errors=True) as spool:
+        return _read_files(paths, workers, chunk_rows, spool)
+
+
+def _read_files(paths, workers, chunk_rows, spool):
+    tasks = []
+    for path in paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No such data file: {path}")
+        sheets = data_sheets(path) if path.lower().endswith(WORKBOOK_TYPES) else [None]
+        for sheet in sheets:
+            tasks.append((path, sheet, chunk_rows, os.path.join(spool, str(len(tasks)))))
+
+    # A single sheet cannot be split, so the pool only pays off with several sheets or files. Workers are
+    # spawned, not forked: this runs in server and refresher threads, and forking a threaded process can
+    # deadlock the child.
+    if len(tasks) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(tasks)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            parts = list(pool.map(read_part, tasks))
+    else:
+        parts = [read_part(task) for task in tasks]
+
+    results = []
+    for path in paths:
+        mine = [part for task, part in zip(tasks, parts) if task[0] == path]
+        # Empty sheets only matter when every sheet is empty
+        tables = _read_chunks([file for part in mine for file in part[0]])
+        tables = [table for table in tables if table.num_rows] or tables[:1]
+        df = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+        del tables
+        # Chunk dictionaries list values in order of appearance; keep categories sorted as astype("category") does
+        for column in CATEGORY_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].cat.reorder_categories(sorted(df[column].cat.categories))
+        usage = mine[0][1]
+        for part in mine[1:]:
+            usage = usage.add(part[1], fill_value=0)
+        rows = sum(part[3] for part in mine)
+        seconds = sum(part[4] for part in mine)
+        results.append((df, pd.DataFrame({"dtype": mine[0][2], "bytes": usage}), {
+            "file": os.path.basename(path),
+            "sheets": len(mine),
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds else 0.0,
+        }))
+    return results
+
+
+# Rows of one sales file, see read_files
+def read_file(path, workers=config.INGEST_WORKERS, chunk_rows=CHUNK_ROWS):
+    return read_files([path], workers, chunk_rows)[0]